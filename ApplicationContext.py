@@ -3,8 +3,20 @@
 import signal
 import sys
 import asyncio
+import functools
 import logging
-from typing import NoReturn, Optional
+import threading
+from typing import Optional
+
+try:
+    import uvloop
+    _new_event_loop = uvloop.new_event_loop
+except ImportError:
+    # uvloop is optional and unavailable on Windows; fall back to the stock loop
+    _new_event_loop = asyncio.new_event_loop
+
+# Python 3.12+: run tasks synchronously until their first real suspension
+_eager_task_factory = getattr(asyncio, "eager_task_factory", None)
 
 
 class ApplicationContext:
@@ -18,12 +30,39 @@ class ApplicationContext:
         cleanup_task (Optional[asyncio.Task]): A task for performing cleanup operations.
         conversation_manager (Optional[ConversationManager]): The conversation manager instance.
         event_loop (Optional[asyncio.AbstractEventLoop]): The event loop running the application.
+        background_loop (Optional[asyncio.AbstractEventLoop]): A long-lived loop running in a daemon
+            thread, used by the GUI to run coroutines without creating a loop per request.
     """
 
     def __init__(self):
         self.cleanup_task: Optional[asyncio.Task] = None
         self.conversation_manager: Optional['ConversationManager'] = None
         self.event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.background_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._background_lock = threading.Lock()
+
+    def get_background_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Return the shared background event loop, starting it on first use.
+
+        The loop runs forever in a daemon thread. Work is submitted to it with
+        asyncio.run_coroutine_threadsafe, which amortizes loop and selector setup
+        across requests.
+
+        Returns:
+            asyncio.AbstractEventLoop: The running background loop.
+        """
+        if self.background_loop is None:
+            with self._background_lock:
+                if self.background_loop is None:
+                    loop = _new_event_loop()
+                    if _eager_task_factory is not None:
+                        loop.set_task_factory(_eager_task_factory)
+                    thread = threading.Thread(target=loop.run_forever, name="background-loop", daemon=True)
+                    thread.start()
+                    self.background_loop = loop
+                    logging.info("Background event loop started")
+        return self.background_loop
 
 
 # Global application context
@@ -47,47 +86,72 @@ async def async_cleanup() -> None:
     logging.info("Asynchronous cleanup completed")
 
 
-def signal_handler(sig: int, frame) -> NoReturn:
+def _on_signal(loop: asyncio.AbstractEventLoop, sig: int) -> None:
     """
-    Handle interrupt signals (e.g., KeyboardInterrupt) gracefully.
+    Handle an interrupt signal delivered through the event loop.
 
-    This function is designed to be used as a signal handler for SIGINT (Ctrl+C).
-    It logs the interrupt event, initiates the cleanup process, and exits the program.
+    Schedules the asynchronous cleanup on the running loop and stops the loop
+    once the cleanup task has finished.
 
     Args:
+        loop (asyncio.AbstractEventLoop): The loop the handler was installed on.
         sig (int): The signal number.
-        frame: The current stack frame.
-
-    Returns:
-        NoReturn: This function does not return as it exits the program.
     """
     logging.info(f"Received signal {sig}. Initiating graceful shutdown.")
     print("\nReceived interrupt signal. Shutting down gracefully...")
 
-    if app_context.event_loop and app_context.event_loop.is_running():
-        # Schedule the cleanup task in the event loop
-        app_context.cleanup_task = app_context.event_loop.create_task(async_cleanup())
+    if app_context.cleanup_task and not app_context.cleanup_task.done():
+        logging.debug("Cleanup already in progress, ignoring repeated signal")
+        return
 
-        # Run the event loop until the cleanup task is complete
-        app_context.event_loop.run_until_complete(app_context.cleanup_task)
-    else:
-        logging.warning("Event loop not running. Skipping asynchronous cleanup.")
+    app_context.cleanup_task = loop.create_task(async_cleanup())
+    app_context.cleanup_task.add_done_callback(lambda _: loop.stop())
 
-    # Perform any additional synchronous cleanup here
-    # For example, closing file handles, releasing system resources, etc.
 
+def _fallback_signal_handler(sig: int, frame) -> None:
+    """
+    Handle interrupt signals on platforms without loop.add_signal_handler (Windows).
+
+    Python runs signal handlers on the main thread, which is also the thread running
+    the application's event loop, so the handler must not wait for the cleanup. It
+    hands the signal to _on_signal on the loop instead, which schedules the cleanup
+    and stops the loop when it is done. Without a running loop the process exits
+    immediately.
+
+    Args:
+        sig (int): The signal number.
+        frame: The current stack frame.
+    """
+    loop = app_context.event_loop
+    if loop and loop.is_running():
+        loop.call_soon_threadsafe(_on_signal, loop, sig)
+        return
+
+    logging.info(f"Received signal {sig}. Initiating graceful shutdown.")
+    print("\nReceived interrupt signal. Shutting down gracefully...")
+    logging.warning("Event loop not running. Skipping asynchronous cleanup.")
     logging.info("Shutdown complete. Exiting.")
     sys.exit(0)
 
 
-def setup_signal_handling():
+def setup_signal_handling(loop: asyncio.AbstractEventLoop) -> None:
     """
     Set up signal handling for the application.
 
     This function should be called early in the application's startup process
-    to ensure that interrupt signals are properly handled.
+    to ensure that interrupt signals are properly handled. Handlers are installed
+    on the event loop so the signal wakes the selector directly and the cleanup
+    coroutine is scheduled on the existing loop.
+
+    Args:
+        loop (asyncio.AbstractEventLoop): The event loop running the application.
     """
-    signal.signal(signal.SIGINT, signal_handler)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, functools.partial(_on_signal, loop, sig))
+        except (NotImplementedError, RuntimeError):
+            # add_signal_handler is unavailable on Windows event loops
+            signal.signal(sig, _fallback_signal_handler)
     logging.info("Signal handling set up")
 
 
@@ -1,48 +1,171 @@
-import json
 import asyncio
+import hashlib
+import io
+import json
+import logging
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QComboBox, QTextEdit, QPushButton,
     QHBoxLayout, QMainWindow, QMessageBox, QStatusBar, QDialog,
     QDialogButtonBox, QLineEdit, QLabel, QFormLayout
 )
-from PyQt5.QtGui import QTextCursor, QColor, QTextCharFormat, QPalette, QFont
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtGui import QTextCursor, QColor, QTextCharFormat, QTextBlockFormat, QTextDocument, QPalette, QFont
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QAtomicInt, QTimer, pyqtSignal
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.header import Header
+from email.utils import formataddr, getaddresses
 from dotenv import load_dotenv, set_key
-from google_api import get_gmail_service
-from googleapiclient.discovery import build
+from google_api import (
+    get_gmail_service, invalidate_gmail_service, load_credentials, save_credentials, discard_credentials,
+    execute_with_backoff
+)
 from googleapiclient.errors import HttpError
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from email.mime.text import MIMEText
+from google.auth.exceptions import RefreshError
 import base64
-import os
-from google_api import get_gmail_service
+import uuid
 import re
+from operator import itemgetter
+from collections import OrderedDict
+import sqlite3
+from html import escape
+from ApplicationContext import app_context
+from HistoryIndex import HistoryIndex, HISTORY_DECODE_ERRORS
+
+# Message rendering helpers shared by the display and email paths
+_sender_and_message = itemgetter('sender', 'message')
+_MESSAGE_HTML = "<p><b>%s:</b> %s</p>"
+_BODY_RE = re.compile(r'<body.*?>(.*?)</body>', re.DOTALL)
+
+
+def _messages_hash(messages):
+    """Content hash of a list of history messages, used to key stored moderator summaries."""
+    return hashlib.sha1(json.dumps(messages, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+# Email document shell using GitHub Dark theme colors; the conversation is written between head and tail
+_EMAIL_HTML_HEAD = """
+        <html>
+        <head>
+        <style>
+            body { background-color: #0d1117; color: #c9d1d9; font-family: -apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif,Apple Color Emoji,Segoe UI Emoji; line-height: 1.5; }
+            h2 { color: #58a6ff; border-bottom: 1px solid #30363d; padding-bottom: 0.3em; }
+            .message { margin-bottom: 1.5em; }
+            .sender { font-weight: bold; color: #58a6ff; }
+            pre { background-color: #161b22; border: 1px solid #30363d; padding: 16px; border-radius: 6px; overflow-x: auto; font-family: SFMono-Regular,Consolas,Liberation Mono,Menlo,monospace; font-size: 85%; }
+            code { background-color: rgba(110,118,129,0.4); border-radius: 6px; padding: 0.2em 0.4em; font-family: SFMono-Regular,Consolas,Liberation Mono,Menlo,monospace; font-size: 85%; }
+            a { color: #58a6ff; text-decoration: none; }
+            a:hover { text-decoration: underline; }
+        </style>
+        </head>
+        <body>
+            <div style="background-color: #0d1117; color: #c9d1d9; padding: 20px; max-width: 800px; margin: 0 auto;">
+"""
+_EMAIL_HTML_TAIL = """
+            </div>
+        </body>
+        </html>
+"""
 
 
-class ModeratorReplyThread(QThread):
+class _SummarySignals(QObject):
     reply_received = pyqtSignal(str, str)  # Changed to emit both summary and thread topic
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
 
-    def __init__(self, conversation_manager, thread_id, thread_topic):
+class SummaryRunnable(QRunnable):
+    """
+    Requests a moderator summary from a QThreadPool worker.
+
+    run() only posts the coroutine to app_context's long-lived loop and returns,
+    so the pooled thread is released immediately and rapid clicks cannot grow
+    the thread count. Results come back through queued signals; cancel() sets
+    an atomic flag that suppresses the reply and cancels the pending future.
+    """
+
+    def __init__(self, conversation_manager, thread_id, thread_topic, previous_summary=None, summarized_count=0):
         super().__init__()
+        self.signals = _SummarySignals()
         self.conversation_manager = conversation_manager
         self.thread_id = thread_id
         self.thread_topic = thread_topic
+        self.previous_summary = previous_summary
+        self.summarized_count = summarized_count
+        self.future = None
+        self._cancelled = QAtomicInt(0)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        # The window keeps a reference so it can cancel the request later
+        self.setAutoDelete(False)
+
+    def run(self):
+        if self._cancelled.load():
+            self.signals.finished.emit()
+            return
+        self.future = asyncio.run_coroutine_threadsafe(
+            self.conversation_manager.generate_moderator_summary_for_history(
+                self.thread_id, self.previous_summary, self.summarized_count),
+            app_context.get_background_loop()
+        )
+        self.future.add_done_callback(self._on_done)
+
+    def _on_done(self, future):
+        # Called on the loop thread; signals are queued onto the GUI thread
+        if not self._cancelled.load():
+            if future.cancelled():
+                self.logger.warning(f"Moderator summary for thread {self.thread_id} was cancelled")
+                self.signals.error.emit("The summary request was cancelled.")
+            elif future.exception() is not None:
+                error = future.exception()
+                self.logger.error(f"Error generating moderator summary for thread {self.thread_id}: {error}",
+                                  exc_info=error)
+                self.signals.error.emit(str(error))
+            else:
+                self.signals.reply_received.emit(future.result(), self.thread_topic)
+        self.signals.finished.emit()
+
+    def cancel(self):
+        self._cancelled.store(1)
+        if self.future is not None:
+            self.future.cancel()
+
+
+class _HistoryLoadSignals(QObject):
+    history_loaded = pyqtSignal(object, bool)  # (thread_id, date, topic) list, index rebuilt
+    load_finished = pyqtSignal()
+
+
+class HistoryLoadRunnable(QRunnable):
+    """
+    Refreshes the history index and lists its threads on a QThreadPool worker.
+
+    Uses its own HistoryIndex connection, since SQLite connections cannot be shared
+    across threads.
+    """
+
+    def __init__(self, history_file):
+        super().__init__()
+        self.signals = _HistoryLoadSignals()
+        self.history_file = history_file
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.setAutoDelete(False)
 
     def run(self):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        history_index = None
         try:
-            reply = loop.run_until_complete(
-                self.conversation_manager.generate_moderator_summary_for_history(self.thread_id)
-            )
-            self.reply_received.emit(reply, self.thread_topic)
+            history_index = HistoryIndex(self.history_file)
+            rebuilt = history_index.refresh()
+            self.signals.history_loaded.emit(history_index.threads(), rebuilt)
+        except FileNotFoundError:
+            self.logger.warning("Conversation history file not found.")
+        except HISTORY_DECODE_ERRORS:
+            self.logger.error("Error decoding the conversation history file.")
+        except sqlite3.Error as e:
+            self.logger.error(f"Error reading the conversation history index: {e}")
         finally:
-            loop.close()
+            if history_index:
+                history_index.close()
+            self.signals.load_finished.emit()
 
 
 class ModeratorSummaryDialog(QDialog):
@@ -102,12 +225,66 @@ class ModeratorSummaryDialog(QDialog):
         email_dialog.exec_()
 
 
+def _encode_part(text):
+    """Base64-encode a text part as CRLF-separated lines of 76 characters, as RFC 2045 requires."""
+    return base64.encodebytes(text.encode('utf-8')).replace(b"\n", b"\r\n")
+
+
+def _build_raw_message(to_email, subject, content, body_html):
+    """
+    Build a multipart/alternative RFC 822 message directly as bytes.
+
+    This skips the email.generator pass of MIMEMultipart.as_bytes(), which copies long
+    summaries several times while folding them, and leaves a single base64 pass for the API.
+    Both parts are base64-encoded so no body line exceeds the 998-octet limit, and display
+    names in To are RFC 2047-encoded so non-ASCII recipients are accepted.
+    """
+    boundary = f"=_{uuid.uuid4().hex}"
+    encoded_to = ", ".join(formataddr(address, charset='utf-8') for address in getaddresses([to_email]))
+    encoded_subject = Header(subject, 'utf-8').encode(linesep='\r\n')
+    return b"".join((
+        (f"To: {encoded_to}\r\n"
+         f"Subject: {encoded_subject}\r\n"
+         f"MIME-Version: 1.0\r\n"
+         f"Content-Type: multipart/alternative; boundary=\"{boundary}\"\r\n"
+         f"\r\n"
+         f"--{boundary}\r\n"
+         f"Content-Type: text/plain; charset=utf-8\r\n"
+         f"Content-Transfer-Encoding: base64\r\n"
+         f"\r\n").encode('ascii'),
+        _encode_part(content),
+        (f"--{boundary}\r\n"
+         f"Content-Type: text/html; charset=utf-8\r\n"
+         f"Content-Transfer-Encoding: base64\r\n"
+         f"\r\n").encode('ascii'),
+        _encode_part(body_html),
+        f"--{boundary}--\r\n".encode('ascii'),
+    ))
+
+
+def _do_send(to_email, subject, content, body_html):
+    """Build the message and send it through the Gmail API. Blocks until the request completes."""
+    service = get_gmail_service()
+    raw_message = base64.urlsafe_b64encode(_build_raw_message(to_email, subject, content, body_html)).decode('ascii')
+    send_message = {'raw': raw_message}
+
+    return execute_with_backoff(service.users().messages().send(userId="me", body=send_message))
+
+
+async def _run_blocking(func, *args):
+    """Run a blocking Google API call in the background loop's default executor."""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
 class EmailDialog(QDialog):
+    send_finished = pyqtSignal(str, str, object)  # to_email, subject, error (None on success)
+
     def __init__(self, parent=None, content="", subject="", formatted_content=""):
         super().__init__(parent)
         self.content = content
         self.formatted_content = formatted_content
         self.subject = subject
+        self.send_finished.connect(self.on_send_finished)
         self.init_ui()
 
     def init_ui(self):
@@ -139,10 +316,10 @@ class EmailDialog(QDialog):
         layout.addWidget(QLabel("Preview:"))
         layout.addWidget(self.preview)
 
-        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
-        button_box.accepted.connect(self.send_email)
-        button_box.rejected.connect(self.reject)
-        layout.addWidget(button_box)
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.button_box.accepted.connect(self.send_email)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
 
         # Add Setup button
         self.setup_button = QPushButton("Setup")
@@ -152,28 +329,29 @@ class EmailDialog(QDialog):
     def send_email(self):
         to_email = self.to_email.text()
         subject = self.subject_line.text()
-        body_html = self.formatted_content
-
-        try:
-            service = get_gmail_service()
-            message = MIMEMultipart('alternative')
-            message['to'] = to_email
-            message['subject'] = subject
-
-            part1 = MIMEText(self.content, 'plain')
-            part2 = MIMEText(body_html, 'html')
-
-            message.attach(part1)
-            message.attach(part2)
 
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
-            send_message = {'raw': raw_message}
+        # The Gmail API call blocks on the network, so run it in the background loop's executor
+        self.button_box.setEnabled(False)
+        future = asyncio.run_coroutine_threadsafe(
+            _run_blocking(_do_send, to_email, subject, self.content, self.formatted_content),
+            app_context.get_background_loop()
+        )
+        future.add_done_callback(
+            lambda fut: self.send_finished.emit(to_email, subject, None if fut.cancelled() else fut.exception())
+        )
 
-            message = service.users().messages().send(userId="me", body=send_message).execute()
+    def on_send_finished(self, to_email, subject, error):
+        self.button_box.setEnabled(True)
+        if error is None:
             QMessageBox.information(self, "Email Sent", f"Email sent to {to_email} with subject: {subject}")
             self.accept()
-        except HttpError as error:
-            QMessageBox.critical(self, "Error", f"Failed to send email: {str(error)}")
+            return
+
+        if isinstance(error, HttpError) and error.resp.status == 401:
+            # Credentials were revoked or expired; forget them so the next send signs in again
+            discard_credentials()
+            invalidate_gmail_service()
+        QMessageBox.critical(self, "Error", f"Failed to send email: {str(error)}")
 
     def open_email_setup(self):
         setup_window = EmailSetupWindow(self)
@@ -182,10 +360,13 @@ class EmailDialog(QDialog):
 
 class EmailSetupWindow(QDialog):
     SCOPES = ['https://www.googleapis.com/auth/gmail.send']
+    auth_finished = pyqtSignal(object)  # error (None on success)
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Email Setup")
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.auth_finished.connect(self.on_auth_finished)
         self.setup_ui()
 
     def setup_ui(self):
@@ -204,40 +385,50 @@ class EmailSetupWindow(QDialog):
         self.setLayout(layout)
 
     def authenticate_google(self):
-        creds = None
-        try:
-            if os.path.exists('token.json'):
-                creds = Credentials.from_authorized_user_file('token.json', self.SCOPES)
-            if not creds or not creds.valid:
-                if creds and creds.expired and creds.refresh_token:
-                    creds.refresh(Request())
-                else:
-                    raise Exception("Credentials are invalid or expired")
-        except Exception as e:
-            print(f"Error during refresh: {e}")
-            if os.path.exists('token.json'):
-                os.remove('token.json')
-            creds = None
-
-        if not creds:
+        # The OAuth flow waits on the user's browser, so run it off the GUI thread
+        self.auth_button.setEnabled(False)
+        self.info_label.setText("Waiting for Google sign-in to complete in your browser...")
+        future = asyncio.run_coroutine_threadsafe(_run_blocking(self._authenticate_blocking),
+                                                  app_context.get_background_loop())
+        future.add_done_callback(
+            lambda fut: self.auth_finished.emit(None if fut.cancelled() else fut.exception())
+        )
+
+    def _authenticate_blocking(self):
+        creds = load_credentials()
+
+        if creds and not creds.valid and creds.expired and creds.refresh_token:
+            try:
+                creds.refresh(Request())
+            except RefreshError as e:
+                self.logger.warning(f"Stored Google token could not be refreshed: {e}")
+                discard_credentials()
+                creds = None
+            else:
+                save_credentials(creds)
+
+        if not creds or not creds.valid:
             flow = InstalledAppFlow.from_client_secrets_file('credentials.json', self.SCOPES)
-            creds = flow.run_local_server(port=0)
-            with open('token.json', 'w') as token:
-                token.write(creds.to_json())
+            save_credentials(flow.run_local_server(port=0))
+            # A service built from the old token must not be reused
+            invalidate_gmail_service()
 
-        self.accept()
+    def on_auth_finished(self, error):
+        if error is None:
+            self.accept()
+            return
 
+        self.logger.error(f"Google authentication failed: {error}")
+        self.info_label.setText("Please authenticate with your Google account.")
+        self.auth_button.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Google authentication failed: {str(error)}")
 
-import json
-import logging
-from PyQt5.QtWidgets import (
-    QDialog, QVBoxLayout, QComboBox, QTextEdit, QPushButton,
-    QHBoxLayout, QMessageBox, QStatusBar
-)
-from PyQt5.QtGui import QTextCursor, QColor, QTextCharFormat
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
 
 class ConversationHistoryWindow(QDialog):
+    CONVERSATION_HISTORY_FILE = 'conversation_history.json'
+    MESSAGE_WINDOW = 200  # Messages laid out per render of a thread
+    HTML_CACHE_SIZE = 16  # Rendered threads kept for instant revisits
+
     def __init__(self, parent=None, insert_header=None, insert_divider=None, insert_message_content=None,
                  reset_formatting=None, config=None):
         super().__init__(parent)
@@ -249,9 +440,20 @@ class ConversationHistoryWindow(QDialog):
         self.insert_message_content = insert_message_content
         self.reset_formatting = reset_formatting
         self.config = config
+        self.thread_meta = {}
+        self.history = {}
+        self.history_index = None
+        self._displayed_messages = []
+        self._displayed_thread_id = None
+        self._html_cache = OrderedDict()  # thread_id -> (rendered HTML, first rendered message index)
+        self._first_rendered = 0
+        self._rendering = False
+        self.history_load_runnable = None
+        self.summary_runnable = None
+        self._pending_summary_key = None  # (thread_id, content_hash, message_count) of the summary being generated
         self.init_ui()
-        self.load_conversation_history()
-        self.moderator_reply_thread = None
+        # Show the empty dialog first and fill it in once the history has been read
+        QTimer.singleShot(0, self.load_conversation_history)
 
 
     def init_ui(self):
@@ -267,6 +469,7 @@ class ConversationHistoryWindow(QDialog):
         self.conversation_display = QTextEdit()
         self.conversation_display.setReadOnly(True)
         self.conversation_display.setAcceptRichText(True)
+        self.conversation_display.verticalScrollBar().valueChanged.connect(self.on_display_scrolled)
         layout.addWidget(self.conversation_display)
 
         # Apply styling
@@ -292,38 +495,55 @@ class ConversationHistoryWindow(QDialog):
         layout.addWidget(self.status_bar)
 
     def load_conversation_history(self):
+        """Refresh the history index on a pooled worker; the combo box is filled in on_history_loaded."""
+        self.status_bar.showMessage("Loading…")
+        self.history_load_runnable = HistoryLoadRunnable(self.CONVERSATION_HISTORY_FILE)
+        self.history_load_runnable.signals.history_loaded.connect(self.on_history_loaded)
+        self.history_load_runnable.signals.load_finished.connect(self.status_bar.clearMessage)
+        QThreadPool.globalInstance().start(self.history_load_runnable)
+
+    def on_history_loaded(self, sorted_threads, rebuilt):
+        self.thread_meta = {thread_id: (date_time, topic) for thread_id, date_time, topic in sorted_threads}
+
+        # Block currentIndexChanged while repopulating so each insert doesn't reload the display
+        self.thread_combo.blockSignals(True)
         try:
-            with open('conversation_history.json', 'r') as f:
-                self.history = json.load(f)
-
-            # Clear existing items
             self.thread_combo.clear()
-
-            # Sort threads by date, most recent first
-            sorted_threads = sorted(self.history.items(), key=lambda x: x[1]['date'], reverse=True)
-
-            # Populate combo box with formatted strings
-            for thread_id, thread_data in sorted_threads:
-                date_time = thread_data['date']
-                topic = thread_data['topic']
-                display_text = f"{date_time} - {topic}"
-                self.thread_combo.addItem(display_text, thread_id)
-
-            # Set the current index to the most recent thread (index 0)
+            # Populate combo box with formatted strings (already sorted most recent first)
+            for thread_id, date_time, topic in sorted_threads:
+                self.thread_combo.addItem(f"{date_time} - {topic}", thread_id)
             if self.thread_combo.count() > 0:
                 self.thread_combo.setCurrentIndex(0)
-                self.load_conversation(0)  # Load the most recent conversation
-
-            self.logger.debug(f"Loaded {len(sorted_threads)} conversation threads")
-        except FileNotFoundError:
-            self.logger.warning("Conversation history file not found.")
-        except json.JSONDecodeError:
-            self.logger.error("Error decoding the conversation history file.")
+        finally:
+            self.thread_combo.blockSignals(False)
+
+        # Load the most recent conversation once, after the combo box is complete
+        if self.thread_combo.count() > 0:
+            self.load_conversation(0)
+
+        self.logger.debug(f"Loaded {len(sorted_threads)} conversation threads (index rebuilt: {rebuilt})")
+
+    def _get_history_index(self):
+        # Opened on the GUI thread; SQLite connections must stay on the thread that created them
+        if self.history_index is None:
+            self.history_index = HistoryIndex(self.CONVERSATION_HISTORY_FILE)
+        return self.history_index
+
+    def get_thread(self, thread_id):
+        """Return the full thread dict, reading its messages from disk on first access."""
+        if thread_id not in self.history:
+            date_time, topic = self.thread_meta[thread_id]
+            self.history[thread_id] = {
+                'date': date_time,
+                'topic': topic,
+                'messages': self._get_history_index().messages(thread_id)
+            }
+        return self.history[thread_id]
 
     def load_conversation(self, index):
         thread_id = self.thread_combo.itemData(index)
-        if thread_id in self.history:
-            self.display_conversation(self.history[thread_id])
+        if thread_id in self.thread_meta:
+            self.display_conversation(self.get_thread(thread_id), thread_id)
         else:
             self.logger.warning(f"Thread ID {thread_id} not found in history")
 
@@ -337,31 +557,104 @@ class ConversationHistoryWindow(QDialog):
             font = QFont(self.config.get('font_family', 'Arial'), int(self.config.get('font_size', 12)))
             self.conversation_display.setFont(font)
 
-    def display_conversation(self, conversation):
-        self.conversation_display.clear()
-        cursor = self.conversation_display.textCursor()
+    def display_conversation(self, conversation, thread_id=None):
+        # Only the most recent MESSAGE_WINDOW messages are laid out; earlier ones are
+        # prepended a window at a time when the user scrolls to the top
+        messages = conversation['messages']
+        self._displayed_messages = messages
+        self._displayed_thread_id = thread_id
+        cached = self._html_cache.get(thread_id) if thread_id is not None else None
+        self._first_rendered = cached[1] if cached else max(0, len(messages) - self.MESSAGE_WINDOW)
+
+        self._rendering = True
+        self.conversation_display.setUpdatesEnabled(False)
+        try:
+            if cached:
+                # Revisiting a thread: reuse the document rendered last time
+                self._html_cache.move_to_end(thread_id)
+                self.conversation_display.setHtml(cached[0])
+            elif self._has_formatting_callbacks():
+                self.conversation_display.clear()
+                self._insert_messages(self.conversation_display.textCursor(), messages[self._first_rendered:])
+            else:
+                # No formatting callbacks: build the whole document once and lay it out in a single pass
+                self.conversation_display.setHtml(self._messages_html(messages[self._first_rendered:]))
+        finally:
+            self.conversation_display.setUpdatesEnabled(True)
+            self._rendering = False
 
-        for message in conversation['messages']:
-            sender = message['sender']
-            content = message['message']
+        if thread_id is not None and not cached:
+            self._cache_displayed_html()
+        self.conversation_display.moveCursor(QTextCursor.End)
+        self.conversation_display.ensureCursorVisible()
 
-            if self.insert_header:
-                self.insert_header(cursor, sender)
-            if self.insert_divider:
-                self.insert_divider(cursor)
-            if self.insert_message_content:
-                self.insert_message_content(cursor, content)
+    def _cache_displayed_html(self):
+        self._html_cache[self._displayed_thread_id] = (self.conversation_display.toHtml(), self._first_rendered)
+        self._html_cache.move_to_end(self._displayed_thread_id)
+        while len(self._html_cache) > self.HTML_CACHE_SIZE:
+            self._html_cache.popitem(last=False)
+
+    def on_display_scrolled(self, value):
+        scrollbar = self.conversation_display.verticalScrollBar()
+        if self._rendering or self._first_rendered == 0 or value != scrollbar.minimum():
+            return
+
+        start = max(0, self._first_rendered - self.MESSAGE_WINDOW)
+        earlier = self._displayed_messages[start:self._first_rendered]
+        self._first_rendered = start
+        self.logger.debug(f"Rendering {len(earlier)} earlier messages")
+
+        # Prepend at the start of the document and keep the current view anchored
+        old_maximum = scrollbar.maximum()
+        self._rendering = True
+        try:
+            cursor = QTextCursor(self.conversation_display.document())
+            if self._has_formatting_callbacks():
+                self._insert_messages(cursor, earlier)
             else:
-                # Fallback if insert_message_content is not provided
-                cursor.insertText(f"{sender}: {content}")
+                cursor.insertHtml(self._messages_html(earlier))
+        finally:
+            self._rendering = False
+        scrollbar.setValue(scrollbar.maximum() - old_maximum)
+        if self._displayed_thread_id is not None:
+            self._cache_displayed_html()
+
+    def _has_formatting_callbacks(self):
+        return bool(self.insert_header or self.insert_divider or self.insert_message_content)
+
+    @staticmethod
+    def _messages_html(messages):
+        return "".join(
+            _MESSAGE_HTML % (escape(sender), escape(content).replace("\n", "<br>"))
+            for sender, content in map(_sender_and_message, messages)
+        )
 
-            cursor.insertBlock()
-            cursor.insertBlock()
+    def _insert_messages(self, cursor, messages):
+        # Group every insert into one edit block so the document is laid out once instead of per insert
+        cursor.beginEditBlock()
+        try:
+            for message in messages:
+                sender = message['sender']
+                content = message['message']
+
+                if self.insert_header:
+                    self.insert_header(cursor, sender)
+                if self.insert_divider:
+                    self.insert_divider(cursor)
+                if self.insert_message_content:
+                    self.insert_message_content(cursor, content)
+                else:
+                    # Fallback if insert_message_content is not provided
+                    cursor.insertText(f"{sender}: {content}")
 
-        self.conversation_display.setTextCursor(cursor)
-        self.conversation_display.ensureCursorVisible()
+                cursor.insertBlock()
+                cursor.insertBlock()
+        finally:
+            cursor.endEditBlock()
 
     def append_message_to_widget(self, sender, content):
+        # The document no longer matches the cached rendering of this thread
+        self._html_cache.pop(self._displayed_thread_id, None)
         cursor = self.conversation_display.textCursor()
         cursor.movePosition(QTextCursor.End)
 
@@ -380,14 +673,31 @@ class ConversationHistoryWindow(QDialog):
         if current_index >= 0:
             thread_id = self.thread_combo.itemData(current_index)
             if hasattr(self.parent, 'conversation_manager'):
+                thread_topic = self.thread_meta[thread_id][1]  # Get the thread topic
+                messages = self.get_thread(thread_id)['messages']
+                content_hash = _messages_hash(messages)
+                previous_summary, summarized_count = None, 0
+                stored = self._get_history_index().latest_summary(thread_id)
+                if stored:
+                    stored_hash, stored_count, stored_summary = stored
+                    if stored_hash == content_hash:
+                        # The thread hasn't changed since it was last summarized; skip the LLM round-trip
+                        self.logger.debug(f"Using cached moderator summary for thread {thread_id}")
+                        self.show_moderator_summary(stored_summary, thread_topic)
+                        return
+                    if stored_count < len(messages) and _messages_hash(messages[:stored_count]) == stored_hash:
+                        # Only messages were appended: summarize just those on top of the stored summary
+                        previous_summary, summarized_count = stored_summary, stored_count
+
                 self.moderator_reply_button.setEnabled(False)
                 self.status_bar.showMessage("Generating Moderator Summary...")
-                thread_topic = self.history[thread_id]['topic']  # Get the thread topic
-                self.moderator_reply_thread = ModeratorReplyThread(self.parent.conversation_manager, thread_id,
-                                                                   thread_topic)
-                self.moderator_reply_thread.reply_received.connect(self.on_moderator_reply_received)
-                self.moderator_reply_thread.finished.connect(self.on_moderator_reply_finished)
-                self.moderator_reply_thread.start()
+                self._pending_summary_key = (thread_id, content_hash, len(messages))
+                self.summary_runnable = SummaryRunnable(self.parent.conversation_manager, thread_id, thread_topic,
+                                                        previous_summary, summarized_count)
+                self.summary_runnable.signals.reply_received.connect(self.on_moderator_reply_received)
+                self.summary_runnable.signals.error.connect(self.on_moderator_reply_failed)
+                self.summary_runnable.signals.finished.connect(self.on_moderator_reply_finished)
+                QThreadPool.globalInstance().start(self.summary_runnable)
             else:
                 QMessageBox.warning(self, "Error", "Conversation manager not available.")
         else:
@@ -395,6 +705,21 @@ class ConversationHistoryWindow(QDialog):
 
     def on_moderator_reply_received(self, reply, thread_topic):
         self.status_bar.clearMessage()
+        # generate_moderator_summary_for_history reports failures as text; only cache real summaries
+        if self._pending_summary_key and not reply.startswith("Unable to generate summary"):
+            try:
+                self._get_history_index().store_summary(*self._pending_summary_key, reply)
+            except sqlite3.Error as e:
+                self.logger.error(f"Error caching moderator summary: {e}")
+        self._pending_summary_key = None
+        self.show_moderator_summary(reply, thread_topic)
+
+    def on_moderator_reply_failed(self, message):
+        self.status_bar.clearMessage()
+        self._pending_summary_key = None
+        QMessageBox.critical(self, "Error", f"Failed to generate moderator summary: {message}")
+
+    def show_moderator_summary(self, reply, thread_topic):
         summary_dialog = ModeratorSummaryDialog(
             self,
             reply,
@@ -412,12 +737,12 @@ class ConversationHistoryWindow(QDialog):
         current_index = self.thread_combo.currentIndex()
         if current_index >= 0:
             thread_id = self.thread_combo.itemData(current_index)
-            if thread_id in self.history:
-                conversation = self.history[thread_id]
+            if thread_id in self.thread_meta:
+                conversation = self.get_thread(thread_id)
                 email_content = self.format_conversation_for_email(conversation)
                 subject = f"Conversation: {conversation['topic']}"
-                email_dialog = EmailDialog(self, "\n\n".join(
-                    [f"{msg['sender']}: {msg['message']}" for msg in conversation['messages']]), subject, email_content)
+                plain_content = "\n\n".join("%s: %s" % _sender_and_message(msg) for msg in conversation['messages'])
+                email_dialog = EmailDialog(self, plain_content, subject, email_content)
                 email_dialog.exec_()
             else:
                 QMessageBox.warning(self, "Error", "Selected conversation thread not found in history.")
@@ -425,65 +750,54 @@ class ConversationHistoryWindow(QDialog):
             QMessageBox.warning(self, "No Thread Selected", "Please select a conversation thread first.")
 
     def format_conversation_for_email(self, conversation):
-        # Define styles for the email content using GitHub Dark theme colors
-        email_styles = """
-        <style>
-            body { background-color: #0d1117; color: #c9d1d9; font-family: -apple-system,BlinkMacSystemFont,Segoe UI,Helvetica,Arial,sans-serif,Apple Color Emoji,Segoe UI Emoji; line-height: 1.5; }
-            h2 { color: #58a6ff; border-bottom: 1px solid #30363d; padding-bottom: 0.3em; }
-            .message { margin-bottom: 1.5em; }
-            .sender { font-weight: bold; color: #58a6ff; }
-            pre { background-color: #161b22; border: 1px solid #30363d; padding: 16px; border-radius: 6px; overflow-x: auto; font-family: SFMono-Regular,Consolas,Liberation Mono,Menlo,monospace; font-size: 85%; }
-            code { background-color: rgba(110,118,129,0.4); border-radius: 6px; padding: 0.2em 0.4em; font-family: SFMono-Regular,Consolas,Liberation Mono,Menlo,monospace; font-size: 85%; }
-            a { color: #58a6ff; text-decoration: none; }
-            a:hover { text-decoration: underline; }
-        </style>
+        rendered_messages = self._render_messages_for_email(conversation['messages'])
+
+        buffer = io.StringIO()
+        buffer.write(_EMAIL_HTML_HEAD)
+        buffer.write(f"<h2>Conversation: {conversation['topic']}</h2>")
+        for message, message_html in zip(conversation['messages'], rendered_messages):
+            buffer.write(f'<div class="message"><span class="sender">{message["sender"]}:</span><br>')
+            buffer.write(message_html)
+            buffer.write('</div>')
+        buffer.write(_EMAIL_HTML_TAIL)
+        return buffer.getvalue()
+
+    def _render_messages_for_email(self, messages):
         """
+        Render each message's content to an HTML fragment for the email body.
 
-        formatted_content = f"""
-        <html>
-        <head>
-            {email_styles}
-        </head>
-        <body>
-            <div style="background-color: #0d1117; color: #c9d1d9; padding: 20px; max-width: 800px; margin: 0 auto;">
-                <h2>Conversation: {conversation['topic']}</h2>
+        All messages go through insert_message_content into one QTextDocument separated by
+        sentinel paragraphs, so the document is serialized once instead of once per message.
         """
+        if not self.insert_message_content:
+            return [f'<p>{message["message"]}</p>' for message in messages]
+
+        document = QTextDocument()
+        cursor = QTextCursor(document)
+        sentinel = f"@@message-{uuid.uuid4().hex}@@"
+        for message in messages:
+            self.insert_message_content(cursor, message['message'])
+            cursor.insertBlock(QTextBlockFormat(), QTextCharFormat())
+            cursor.insertText(sentinel)
+            cursor.insertBlock()
 
-        temp_text_edit = QTextEdit()
-        cursor = temp_text_edit.textCursor()
-
-        for message in conversation['messages']:
-            sender = message['sender']
-            content = message['message']
-
-            formatted_content += f'<div class="message"><span class="sender">{sender}:</span><br>'
-
-            if self.insert_message_content:
-                self.insert_message_content(cursor, content)
-                message_html = temp_text_edit.toHtml()
-                # Extract the body content from the generated HTML
-                body_content = re.search(r'<body.*?>(.*?)</body>', message_html, re.DOTALL)
-                if body_content:
-                    formatted_content += body_content.group(1)
-                else:
-                    formatted_content += message_html
-            else:
-                formatted_content += f'<p>{content}</p>'
-
-            formatted_content += '</div>'
-
-            temp_text_edit.clear()
+        document_html = document.toHtml()
+        body_content = _BODY_RE.search(document_html)
+        if body_content:
+            document_html = body_content.group(1)
+        rendered_messages = re.split(rf'<p[^>]*>(?:<span[^>]*>)?{sentinel}(?:</span>)?</p>', document_html)
 
-        formatted_content += """
-            </div>
-        </body>
-        </html>
-        """
-        return formatted_content
+        # The split leaves one trailing part after the last sentinel
+        if len(rendered_messages) != len(messages) + 1:
+            self.logger.warning("Could not split the rendered conversation per message; sending plain paragraphs")
+            return [f'<p>{message["message"]}</p>' for message in messages]
+        return rendered_messages[:-1]
 
     def closeEvent(self, event):
-        if self.moderator_reply_thread and self.moderator_reply_thread.isRunning():
-            self.moderator_reply_thread.terminate()
-            self.moderator_reply_thread.wait()
+        if self.summary_runnable:
+            self.summary_runnable.cancel()
+        if self.history_index:
+            self.history_index.close()
+            self.history_index = None
         self.parent.history_window = None
         event.accept()
@@ -1,78 +1,284 @@
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+import asyncio
+import bisect
 import logging
 import re
+import threading
+from collections import deque
+from itertools import islice
+
+try:
+    # Optional dense retrieval; without these packages retrieval uses the hashed word vectors
+    from sentence_transformers import SentenceTransformer
+    import faiss
+except ImportError:
+    SentenceTransformer = None
+    faiss = None
+
+N_FEATURES = 2 ** 18
+EMBEDDING_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+HNSW_NEIGHBORS = 32
+_WORD_RE = re.compile(r'\b\w+\b')
+
+
+def _pretokenized(tokens):
+    return tokens
 
 
 class ConversationRAG:
+    _embedding_model = None  # Loaded on a background thread and shared by every instance
+    _embedding_model_loading = False
+    _embedding_model_lock = threading.Lock()
+    _embedding_model_ready = threading.Event()
+
     def __init__(self, max_history=1000):
-        self.vectorizer = TfidfVectorizer(token_pattern=r'\b\w+\b')
-        self.conversation_history = []
-        self.word_history = []
-        self.vector_history = None
+        # Stateless hashing means new words never force a refit of the whole history. Documents are
+        # passed as already-tokenized lists so each message is tokenized exactly once, by _WORD_RE.
+        self.vectorizer = HashingVectorizer(n_features=N_FEATURES, alternate_sign=False, norm='l2',
+                                            analyzer=_pretokenized)
+        # Deques so trimming the oldest entries is O(1) per entry
+        self.conversation_history = deque()
+        self.word_history = deque()
+        # Position of each message's first word among all words ever added. A list so bisect stays
+        # O(log N); the first _msg_starts_trimmed entries belong to trimmed messages and are skipped.
+        self._msg_word_starts = []
+        self._msg_starts_trimmed = 0
+        self._total_words = 0
+        # Running len(' '.join(...)) + 1 of both histories, so trimming never rejoins them
+        self._conv_chars = 0
+        self._word_chars = 0
+        self._rows = deque()  # One CSR block per added message, one row per word
+        self._df = np.zeros(N_FEATURES, dtype=np.int32)  # Document frequency per hashed feature
+        self._vector_history = None
+        self._dirty = False
+        # Dense message embeddings in an HNSW index, ids being the message's position among all messages added.
+        # Messages are embedded in one batch with the next query, so adding them never runs the model.
+        self._use_embeddings = SentenceTransformer is not None
+        self._embeddings = deque()  # fp16 copy of each embedded message's vector, to rebuild the index
+        self._unembedded = 0  # The newest messages of conversation_history not embedded yet
+        self._embedding_index = None
+        self._total_messages = 0
+        self._generation = 0  # Bumped by clear(), so a search in flight can tell its messages are gone
+        if self._use_embeddings:
+            self._start_embedding_model_load()
         self.max_history = max_history
         self.logger = logging.getLogger(self.__class__.__name__)
         self.logger.debug("ConversationRAG initialized with max_history=%d", max_history)
 
-    def _update_vectors(self):
-        try:
-            if self.word_history:
-                self.vector_history = self.vectorizer.fit_transform(self.word_history)
-                self.logger.debug("Vector history updated successfully")
+    @property
+    def vector_history(self):
+        """Word vectors aligned with word_history, stacked lazily after the last insert (None if empty)."""
+        if self._dirty:
+            try:
+                self._vector_history = sp.vstack(self._rows, format='csr') if self._rows else None
+            except Exception as e:
+                self.logger.error("Error updating vectors: %s", str(e), exc_info=True)
+                self._vector_history = None
+            self._dirty = False
+        return self._vector_history
+
+    def _trim_rows(self, excess: int):
+        # Drop the oldest word rows so the matrix stays aligned with word_history
+        while excess and self._rows:
+            block = self._rows[0]
+            n = min(excess, block.shape[0])
+            np.subtract.at(self._df, block[:n].indices, 1)
+            if n == block.shape[0]:
+                self._rows.popleft()
             else:
-                self.vector_history = None
-                self.logger.debug("Vector history set to None (empty conversation)")
+                self._rows[0] = block[n:]
+            excess -= n
+        self._dirty = True
+
+    def _apply_idf(self, matrix):
+        # Smoothed IDF as in TfidfVectorizer. History rows are single words (one-hot after
+        # normalization), so weighting them would not change cosine scores; only the query is weighted.
+        n_docs = len(self.word_history)
+        weighted = matrix.copy()
+        weighted.data *= np.log((1 + n_docs) / (1 + self._df[weighted.indices])) + 1
+        return weighted
+
+    @classmethod
+    def _start_embedding_model_load(cls):
+        # Loading may download the model, so it happens on a daemon thread rather than the caller's
+        with cls._embedding_model_lock:
+            if cls._embedding_model_loading:
+                return
+            cls._embedding_model_loading = True
+        threading.Thread(target=cls._load_embedding_model, name="embedding-model-load", daemon=True).start()
+
+    @classmethod
+    def _load_embedding_model(cls):
+        try:
+            cls._embedding_model = SentenceTransformer(EMBEDDING_MODEL)
         except Exception as e:
-            self.logger.error("Error updating vectors: %s", str(e), exc_info=True)
-            self.vector_history = None
+            logging.getLogger(cls.__name__).error(f"Error loading embedding model, using word vectors: {str(e)}",
+                                                  exc_info=True)
+        finally:
+            cls._embedding_model_ready.set()
+
+    def _embed(self, texts):
+        return self._embedding_model.encode(texts, normalize_embeddings=True,
+                                            convert_to_numpy=True).astype(np.float32)
+
+    @staticmethod
+    def _new_embedding_index(dim: int):
+        # The index stores and searches int8 codes, 4x smaller than float32. The embeddings are
+        # normalized, so every component lies in [-1, 1]; training on those bounds fixes the
+        # quantization range without a pass over real data.
+        index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT)
+        index.train(np.array([[-1.0] * dim, [1.0] * dim], dtype=np.float32))
+        return faiss.IndexIDMap(index)
+
+    def _add_embedded(self, first_id: int, embeddings):
+        """
+        Add the embeddings of the messages with ids first_id, first_id + 1, ... to the index.
+
+        Messages trimmed or embedded by another search while these were being computed are skipped.
+        """
+        pending_start = self._total_messages - self._unembedded
+        skip = max(0, pending_start - first_id)
+        if skip >= len(embeddings):
+            return
+        embeddings = embeddings[skip:]
+        if self._embedding_index is None:
+            self._embedding_index = self._new_embedding_index(embeddings.shape[1])
+        self._embeddings.extend(embeddings.astype(np.float16))
+        self._embedding_index.add_with_ids(
+            embeddings, np.arange(pending_start, pending_start + len(embeddings), dtype=np.int64))
+        self._unembedded -= len(embeddings)
+
+    def _compact_embedding_index(self):
+        # HNSW cannot delete entries; trimmed messages are skipped at search time and the
+        # index is rebuilt from the kept embeddings once they outnumber the live ones
+        dead = self._embedding_index.ntotal - len(self._embeddings)
+        if dead <= len(self._embeddings):
+            return
+        end_id = self._total_messages - self._unembedded
+        self._embedding_index = self._new_embedding_index(self._embedding_index.d)
+        if self._embeddings:
+            self._embedding_index.add_with_ids(
+                np.vstack(self._embeddings).astype(np.float32),
+                np.arange(end_id - len(self._embeddings), end_id, dtype=np.int64))
+
+    async def _search_embeddings(self, query: str, top_k: int):
+        # Embed the query together with every message added since the last search, in one encode call.
+        # The model's forward pass runs in the loop's default executor so it doesn't stall other coroutines.
+        generation = self._generation
+        first_pending = self._total_messages - self._unembedded
+        texts = list(islice(self.conversation_history, len(self.conversation_history) - self._unembedded, None))
+        texts.append(query)
+        try:
+            embeddings = await asyncio.get_running_loop().run_in_executor(None, self._embed, texts)
+        except Exception as e:
+            self.logger.error("Error embedding messages, falling back to word vectors: %s", e, exc_info=True)
+            self._use_embeddings = False
+            self._embeddings.clear()
+            self._unembedded = 0
+            self._embedding_index = None
+            return None
+        if generation != self._generation or not self._use_embeddings:
+            # Cleared while the embeddings were computed; they belong to messages that are gone
+            return None
+        self._add_embedded(first_pending, embeddings[:-1])
+        if self._embedding_index is None:
+            return None
+        query_embedding = embeddings[-1:]
+        first_id = self._total_messages - len(self.conversation_history)
+        dead = self._embedding_index.ntotal - len(self.conversation_history)
+        k = min(self._embedding_index.ntotal, top_k + dead)
+        _, ids = self._embedding_index.search(query_embedding, k)
+        return [self.conversation_history[i - first_id] for i in ids[0] if i >= first_id][:top_k]
 
     def add_message(self, message: str):
         self.conversation_history.append(message)
-        words = re.findall(r'\b\w+\b', message.lower())
+        self._total_messages += 1
+        if self._use_embeddings:
+            self._unembedded += 1
+        self._conv_chars += len(message) + 1
+        words = _WORD_RE.findall(message.lower())
+        self._msg_word_starts.append(self._total_words)
+        self._total_words += len(words)
         self.word_history.extend(words)
+        self._word_chars += sum(map(len, words)) + len(words)
+        if words:
+            rows = self.vectorizer.transform([word] for word in words)
+            self._rows.append(rows)
+            np.add.at(self._df, rows.indices, 1)
+            self._dirty = True
         if len(self.word_history) > self.max_history:
             excess = len(self.word_history) - self.max_history
-            self.word_history = self.word_history[excess:]
-            while len(' '.join(self.conversation_history)) > len(' '.join(self.word_history)):
-                self.conversation_history.pop(0)
-        self._update_vectors()
-        self.logger.debug(f"Added message to RAG. Current word history size: {len(self.word_history)}")
+            for _ in range(excess):
+                self._word_chars -= len(self.word_history.popleft()) + 1
+            self._trim_rows(excess)
+            while self.conversation_history and self._conv_chars > self._word_chars:
+                self._conv_chars -= len(self.conversation_history.popleft()) + 1
+                self._msg_starts_trimmed += 1
+                if self._embeddings:
+                    self._embeddings.popleft()
+                elif self._unembedded:
+                    # Trimmed before it was ever embedded; its id is simply never used
+                    self._unembedded -= 1
+            if self._msg_starts_trimmed > len(self.conversation_history):
+                # Drop the dead prefix once it outweighs the live entries, amortized O(1) per trim
+                del self._msg_word_starts[:self._msg_starts_trimmed]
+                self._msg_starts_trimmed = 0
+            if self._embedding_index is not None:
+                self._compact_embedding_index()
+        self.logger.debug("Added message to RAG. Current word history size: %d", len(self.word_history))
 
     def get_recent_messages(self, n: int) -> str:
-        return "\n".join(self.conversation_history[-n:])
+        return "\n".join(islice(self.conversation_history, max(0, len(self.conversation_history) - n), None))
 
-    def get_relevant_history(self, query: str, top_k: int = 5) -> str:
-        self.logger.debug(f"Getting relevant history for query: {query[:50]}...")
+    async def get_relevant_history(self, query: str, top_k: int = 5) -> str:
+        self.logger.debug("Getting relevant history for query: %.50s...", query)
         if not self.word_history:
             self.logger.info("Word history in RAG is empty")
             return ""
 
-        if self.vector_history is None:
+        vector_history = self.vector_history
+        if vector_history is None:
             self.logger.warning("Vector history is None, returning recent conversation history")
             return self.get_recent_messages(top_k)
 
         try:
-            query_words = re.findall(r'\b\w+\b', query.lower())
-            query_vector = self.vectorizer.transform(query_words)
-            similarities = cosine_similarity(query_vector, self.vector_history).flatten()
+            # Until the embedding model has loaded, retrieval uses the word vectors
+            if self._use_embeddings and self._embedding_model_ready.is_set():
+                if self._embedding_model is None:
+                    self._use_embeddings = False
+                    self._unembedded = 0
+                else:
+                    relevant_messages = await self._search_embeddings(query, top_k)
+                    if relevant_messages is not None:
+                        self.logger.debug("Retrieved %d relevant historical messages from RAG", len(relevant_messages))
+                        return "\n".join(relevant_messages)
 
-            # Get top_k unique indices, sorted by similarity
-            unique_indices = sorted(set(range(len(similarities))), key=lambda i: similarities[i], reverse=True)[:top_k]
+            query_words = _WORD_RE.findall(query.lower())
+            # The query is a single document, so there is one similarity per history word
+            query_vector = self._apply_idf(self.vectorizer.transform([query_words]))
+            similarities = cosine_similarity(query_vector, vector_history).flatten()
 
-            # Map word indices to full messages
-            relevant_messages = set()
-            word_count = 0
+            # Get top_k indices sorted by similarity: O(N) partition, then sort only the top_k
+            k = min(top_k, len(similarities))
+            top_indices = np.argpartition(-similarities, k - 1)[:k]
+            unique_indices = top_indices[np.argsort(-similarities[top_indices], kind='stable')]
+
+            # Map word indices to full messages with a binary search over each message's first word.
+            # Keyed by message index in insertion order, so the result keeps the similarity ranking
+            # and a message matched by several words appears once.
+            first_word = self._total_words - len(self.word_history)
+            trimmed = self._msg_starts_trimmed
+            relevant_messages = {}
             for idx in unique_indices:
-                for i, msg in enumerate(self.conversation_history):
-                    msg_words = re.findall(r'\b\w+\b', msg.lower())
-                    if word_count + len(msg_words) > idx:
-                        relevant_messages.add(msg)
-                        break
-                    word_count += len(msg_words)
-
-            self.logger.debug(f"Retrieved {len(relevant_messages)} relevant historical messages from RAG")
-            return "\n".join(relevant_messages)
+                msg_index = bisect.bisect_right(self._msg_word_starts, first_word + idx, lo=trimmed) - 1 - trimmed
+                if msg_index >= 0 and msg_index not in relevant_messages:
+                    relevant_messages[msg_index] = self.conversation_history[msg_index]
+
+            self.logger.debug("Retrieved %d relevant historical messages from RAG", len(relevant_messages))
+            return "\n".join(relevant_messages.values())
         except Exception as e:
             self.logger.error(f"Error retrieving relevant history from RAG: {str(e)}", exc_info=True)
             return self.get_recent_messages(top_k)
@@ -82,8 +288,20 @@ class ConversationRAG:
         try:
             self.conversation_history.clear()
             self.word_history.clear()
-            self.vector_history = None
-            self.vectorizer = TfidfVectorizer(token_pattern=r'\b\w+\b')
+            self._msg_word_starts.clear()
+            self._msg_starts_trimmed = 0
+            self._total_words = 0
+            self._conv_chars = 0
+            self._word_chars = 0
+            self._rows.clear()
+            self._df.fill(0)
+            self._vector_history = None
+            self._dirty = False
+            self._embeddings.clear()
+            self._unembedded = 0
+            self._embedding_index = None
+            self._total_messages = 0
+            self._generation += 1
             self.logger.info("RAG database cleared successfully")
         except Exception as e:
             self.logger.error(f"Error clearing RAG database: {str(e)}", exc_info=True)
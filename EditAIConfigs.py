@@ -1,19 +1,27 @@
 import sys
+import os
 import json
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QLineEdit,
-                             QTextEdit, QLabel, QPushButton, QMessageBox,
+                             QPlainTextEdit, QLabel, QPushButton, QMessageBox,
                              QScrollArea, QWidget, QSplitter)
+from PyQt5.QtGui import QFontDatabase
 from PyQt5.QtCore import Qt
+from EditorMixin import EditorMixin
+import ast
 import importlib
-import inspect
 
 
-class EditAIConfigs(QDialog):
+class EditAIConfigs(EditorMixin, QDialog):
+    _ai_config_mtime = None  # mtime of ai_config.py when the module was last (re)loaded
+    _function_sources = None  # (mtime, lines, {function name: source}) of ai_config.py, see _functionSources
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Edit AI Configs")
-        self.setGeometry(100, 100, 1200, 800)
+        self.resize(1200, 800)
+        self._restoreSavedGeometry()
         self.config_file = 'ai_config.py'
+        self._source_by_name = {}  # config name -> generate function source shown in the editor
         self.initUI()
         self.loadConfigs()
 
@@ -48,8 +56,10 @@ class EditAIConfigs(QDialog):
         right_layout.addWidget(QLabel("Model:"))
         right_layout.addWidget(self.model_edit)
 
-        self.function_edit = QTextEdit()
+        self.function_edit = QPlainTextEdit()
         self.function_edit.setMinimumHeight(400)
+        self.function_edit.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.function_edit.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
         right_layout.addWidget(QLabel("Generate Function:"))
         right_layout.addWidget(self.function_edit)
 
@@ -76,24 +86,58 @@ class EditAIConfigs(QDialog):
     def loadConfigs(self):
         self.config_list.clear()
         # Read the AI configs from the file
+        # Reloading re-runs ai_config's SDK imports, so only do it when the file changed since the
+        # module was last (re)loaded; the mtime is shared by every dialog opened in this process
+        mtime = os.stat(self.config_file).st_mtime_ns
+        already_imported = 'ai_config' in sys.modules
         self.ai_config_module = importlib.import_module('ai_config')
-        importlib.reload(self.ai_config_module)
-        self.AI_CONFIG = getattr(self.ai_config_module, 'AI_CONFIG')
-
-        # Convert function objects to their source code
+        if already_imported and mtime != EditAIConfigs._ai_config_mtime:
+            importlib.reload(self.ai_config_module)
+        EditAIConfigs._ai_config_mtime = mtime
+        # Edit a copy so ai_config.AI_CONFIG stays exactly what the module defines; saveChanges replaces
+        # whole entries rather than mutating them, so a shallow copy is enough
+        self.AI_CONFIG = dict(getattr(self.ai_config_module, 'AI_CONFIG'))
+
+        lines, function_sources = self._functionSources(mtime)
+        self._source_by_name = {}
         for name, config in self.AI_CONFIG.items():
-            if callable(config['generate_func']):
-                config['generate_func'] = inspect.getsource(config['generate_func'])
+            func = config['generate_func']
+            if callable(func) and func.__name__ in function_sources:
+                self._source_by_name[name] = function_sources[func.__name__]
+            else:
+                self._source_by_name[name] = func if isinstance(func, str) else ""
+        self._splitFile(self.config_file, "AI_CONFIG", lines)
+
+        self.config_list.addItems(list(self.AI_CONFIG))
+
+    def _functionSources(self, mtime):
+        """
+        Return the lines of self.config_file and the source of each top-level function in it.
+
+        The file is parsed once and each function's source is sliced by its line range, rather than
+        calling inspect.getsource per function. The result is shared by every dialog opened in this
+        process and only recomputed when the file's modification time changes.
+        """
+        cached = EditAIConfigs._function_sources
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
 
-        for name in self.AI_CONFIG.keys():
-            self.config_list.addItem(name)
+        with open(self.config_file, 'r') as f:
+            content = f.read()
+        lines = content.splitlines(keepends=True)
+        function_sources = {
+            node.name: "".join(lines[node.lineno - 1:node.end_lineno]) for node in ast.parse(content).body
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        }
+        EditAIConfigs._function_sources = (mtime, lines, function_sources)
+        return lines, function_sources
 
     def loadConfigDetails(self, item):
         name = item.text()
         config = self.AI_CONFIG[name]
         self.name_edit.setText(name)
         self.model_edit.setText(config['model'])
-        self.function_edit.setText(config['generate_func'])
+        self.function_edit.setPlainText(self._source_by_name.get(name, ""))
 
     def saveChanges(self):
         current_item = self.config_list.currentItem()
@@ -108,16 +152,18 @@ class EditAIConfigs(QDialog):
             QMessageBox.warning(self, "Name Exists", "A config with this name already exists.")
             return
 
-        # Prepare the new config
+        # Prepare the new config; the edited source is kept next to the still-callable generate_func
         new_config = {
             'model': self.model_edit.text(),
-            'generate_func': self.function_edit.toPlainText()  # This is already a string
+            'generate_func': self.AI_CONFIG[current_name]['generate_func']
         }
 
         # Update the AI_CONFIG
         self.AI_CONFIG[new_name] = new_config
+        self._source_by_name[new_name] = self.function_edit.toPlainText()
         if current_name != new_name:
             del self.AI_CONFIG[current_name]
+            del self._source_by_name[current_name]
 
         current_item.setText(new_name)
 
@@ -126,28 +172,22 @@ class EditAIConfigs(QDialog):
         QMessageBox.information(self, "Saved", "Changes saved successfully.")
 
     def saveToFile(self):
-        with open(self.config_file, 'r') as f:
-            lines = f.readlines()
-
-        start_index = next(i for i, line in enumerate(lines) if line.strip().startswith("AI_CONFIG = {"))
-        end_index = next(i for i in range(start_index + 1, len(lines)) if lines[i].strip() == "}")
-
-        config_str = "AI_CONFIG = {\n"
+        parts = ["AI_CONFIG = {\n"]
         for name, config in self.AI_CONFIG.items():
-            config_str += f'    "{name}": {{\n'
-            config_str += f'        "model": "{config["model"]}",\n'
-            config_str += f'        "generate_func": {name}_generate,\n'
-            config_str += "    },\n"
-        config_str += "}\n\n"
+            parts.append(f'    {name!r}: {{\n'
+                         f'        "model": {config["model"]!r},\n'
+                         f'        "generate_func": {name}_generate,\n'
+                         "    },\n")
+        parts.append("}\n\n")
 
         # Add the function definitions after the AI_CONFIG dictionary
-        for name, config in self.AI_CONFIG.items():
-            config_str += f"{config['generate_func']}\n\n"  # Write the function source directly
+        for name in self.AI_CONFIG:
+            parts.append(f"{self._source_by_name.get(name, '')}\n\n")  # Write the function source directly
 
-        lines[start_index:end_index + 1] = [config_str]
+        config_str = "".join(parts)
+
+        self._writeBlock(self.config_file, "AI_CONFIG", config_str)
 
-        with open(self.config_file, 'w') as f:
-            f.writelines(lines)
     def addNewConfig(self):
         new_name = "New Config"
         counter = 1
@@ -159,12 +199,13 @@ class EditAIConfigs(QDialog):
             'model': "",
             'generate_func': lambda x, y: None  # Placeholder function
         }
+        self._source_by_name[new_name] = ""
 
-        self.loadConfigs()
-        items = self.config_list.findItems(new_name, Qt.MatchExactly)
-        if items:
-            self.config_list.setCurrentItem(items[0])
-            self.loadConfigDetails(items[0])
+        # Append just the new row instead of reloading and rebuilding the whole list
+        self.config_list.addItem(new_name)
+        new_item = self.config_list.item(self.config_list.count() - 1)
+        self.config_list.setCurrentItem(new_item)
+        self.loadConfigDetails(new_item)
 
     def removeConfig(self):
         current_item = self.config_list.currentItem()
@@ -179,8 +220,9 @@ class EditAIConfigs(QDialog):
 
         if reply == QMessageBox.Yes:
             del self.AI_CONFIG[name]
+            self._source_by_name.pop(name, None)
             self.saveToFile()
-            self.loadConfigs()
+            self.config_list.takeItem(self.config_list.row(current_item))
             self.clearConfigDetails()
             QMessageBox.information(self, "Removed", f"Config '{name}' has been removed.")
 
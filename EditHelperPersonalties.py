@@ -1,18 +1,20 @@
+import ast
 import sys
 import json
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QLineEdit,
-                             QTextEdit, QLabel, QPushButton, QColorDialog, QMessageBox,
+                             QPlainTextEdit, QLabel, QPushButton, QColorDialog, QMessageBox,
                              QScrollArea, QWidget, QComboBox)
 from PyQt5.QtGui import QColor
-from PyQt5.QtCore import Qt
+from EditorMixin import EditorMixin
 from ai_config import AI_CONFIG
 
 
-class EditHelperPersonalities(QDialog):
+class EditHelperPersonalities(EditorMixin, QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Edit Helper Personalities")
-        self.setGeometry(100, 100, 1000, 700)
+        self.resize(1000, 700)
+        self._restoreSavedGeometry()
         self.personalities_file = 'personalities.py'  # Path to your personalities file
         self.initUI()
         self.loadPersonalities()
@@ -44,13 +46,14 @@ class EditHelperPersonalities(QDialog):
         right_layout.addWidget(QLabel("Name:"))
         right_layout.addWidget(self.name_edit)
 
-        self.system_message_edit = QTextEdit()
+        self.system_message_edit = QPlainTextEdit()
         self.system_message_edit.setMinimumHeight(200)  # Set a minimum height
         right_layout.addWidget(QLabel("System Message:"))
         right_layout.addWidget(self.system_message_edit)
 
         self.ai_name_combo = QComboBox()
         self.ai_name_combo.addItems(AI_CONFIG.keys())
+        self._ai_index = {name: i for i, name in enumerate(AI_CONFIG)}  # AI name -> combo index
         right_layout.addWidget(QLabel("AI Name:"))
         right_layout.addWidget(self.ai_name_combo)
 
@@ -83,16 +86,21 @@ class EditHelperPersonalities(QDialog):
         # Read the personalities from the file
         with open(self.personalities_file, 'r') as f:
             content = f.read()
-            exec(content, globals())
-        for name in HELPER_PERSONALITIES.keys():
-            self.personality_list.addItem(name)
+        # Only evaluate the HELPER_PERSONALITIES literal instead of exec-ing the whole module into globals()
+        global HELPER_PERSONALITIES
+        HELPER_PERSONALITIES = next(
+            ast.literal_eval(node.value) for node in ast.parse(content).body
+            if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'HELPER_PERSONALITIES' for t in node.targets)
+        )
+        self._splitFile(self.personalities_file, "HELPER_PERSONALITIES", content.splitlines(keepends=True))
+        self.personality_list.addItems(list(HELPER_PERSONALITIES))
 
     def loadPersonalityDetails(self, item):
         name = item.text()
         personality = HELPER_PERSONALITIES[name]
         self.name_edit.setText(personality['name'])
-        self.system_message_edit.setText(personality['system_message'])
-        self.ai_name_combo.setCurrentText(personality['ai_name'])
+        self.system_message_edit.setPlainText(personality['system_message'])
+        self.ai_name_combo.setCurrentIndex(self._ai_index.get(personality['ai_name'], 0))
         self.current_color = QColor(personality['color'])
         self.updateColorButton()
 
@@ -152,12 +160,11 @@ class EditHelperPersonalities(QDialog):
             'color': "#000000"  # Default to black
         }
 
-        self.loadPersonalities()
-        # Select the new personality
-        items = self.personality_list.findItems(new_name, Qt.MatchExactly)
-        if items:
-            self.personality_list.setCurrentItem(items[0])
-            self.loadPersonalityDetails(items[0])
+        # Append just the new row instead of reloading and rebuilding the whole list
+        self.personality_list.addItem(new_name)
+        new_item = self.personality_list.item(self.personality_list.count() - 1)
+        self.personality_list.setCurrentItem(new_item)
+        self.loadPersonalityDetails(new_item)
 
     def removePersonality(self):
         current_item = self.personality_list.currentItem()
@@ -173,7 +180,7 @@ class EditHelperPersonalities(QDialog):
         if reply == QMessageBox.Yes:
             del HELPER_PERSONALITIES[name]
             self.saveToFile()
-            self.loadPersonalities()
+            self.personality_list.takeItem(self.personality_list.row(current_item))
             self.clearPersonalityDetails()
             QMessageBox.information(self, "Removed", f"Helper personality '{name}' has been removed.")
 
@@ -185,30 +192,19 @@ class EditHelperPersonalities(QDialog):
         self.updateColorButton()
 
     def saveToFile(self):
-        with open(self.personalities_file, 'r') as f:
-            lines = f.readlines()
-
-        # Find the start and end of the HELPER_PERSONALITIES dictionary
-        start_index = next(i for i, line in enumerate(lines) if line.strip().startswith("HELPER_PERSONALITIES = {"))
-        end_index = next(i for i in range(start_index + 1, len(lines)) if lines[i].strip() == "}")
-
         # Convert the HELPER_PERSONALITIES dictionary to a formatted string
-        personalities_str = "HELPER_PERSONALITIES = {\n"
+        parts = ["HELPER_PERSONALITIES = {\n"]
         for name, personality in HELPER_PERSONALITIES.items():
-            personalities_str += f'    "{name}": {{\n'
-            personalities_str += f'        "name": "{personality["name"]}",\n'
-            personalities_str += f'        "system_message": """{personality["system_message"]}""",\n'
-            personalities_str += f'        "ai_name": "{personality["ai_name"]}",\n'
-            personalities_str += f'        "color": "{personality["color"]}",\n'
-            personalities_str += "    },\n"
-        personalities_str += "}"
-
-        # Replace the old HELPER_PERSONALITIES dictionary with the new one
-        lines[start_index:end_index + 1] = [personalities_str]
-
-        # Write the updated content back to the file
-        with open(self.personalities_file, 'w') as f:
-            f.writelines(lines)
+            parts.append(f'    {name!r}: {{\n'
+                         f'        "name": {personality["name"]!r},\n'
+                         f'        "system_message": {self._pythonString(personality["system_message"])},\n'
+                         f'        "ai_name": {personality["ai_name"]!r},\n'
+                         f'        "color": {personality["color"]!r},\n'
+                         "    },\n")
+        parts.append("}")
+        personalities_str = "".join(parts)
+
+        self._writeBlock(self.personalities_file, "HELPER_PERSONALITIES", personalities_str)
 
 
 if __name__ == '__main__':
@@ -1,18 +1,20 @@
+import ast
 import sys
 import json
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QLineEdit,
-                             QTextEdit, QLabel, QPushButton, QColorDialog, QMessageBox,
+                             QPlainTextEdit, QLabel, QPushButton, QColorDialog, QMessageBox,
                              QScrollArea, QWidget, QComboBox)
 from PyQt5.QtGui import QColor
-from PyQt5.QtCore import Qt
+from EditorMixin import EditorMixin
 from ai_config import AI_CONFIG
 
 
-class EditPersonalities(QDialog):
+class EditPersonalities(EditorMixin, QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Edit AI Personalities")
-        self.setGeometry(100, 100, 1000, 700)
+        self.resize(1000, 700)
+        self._restoreSavedGeometry()
         self.personalities_file = 'personalities.py'  # Path to your personalities file
         self.initUI()
         self.loadPersonalities()
@@ -44,13 +46,14 @@ class EditPersonalities(QDialog):
         right_layout.addWidget(QLabel("Name:"))
         right_layout.addWidget(self.name_edit)
 
-        self.system_message_edit = QTextEdit()
+        self.system_message_edit = QPlainTextEdit()
         self.system_message_edit.setMinimumHeight(200)  # Set a minimum height
         right_layout.addWidget(QLabel("System Message:"))
         right_layout.addWidget(self.system_message_edit)
 
         self.ai_name_combo = QComboBox()
         self.ai_name_combo.addItems(AI_CONFIG.keys())
+        self._ai_index = {name: i for i, name in enumerate(AI_CONFIG)}  # AI name -> combo index
         right_layout.addWidget(QLabel("AI Name:"))
         right_layout.addWidget(self.ai_name_combo)
 
@@ -92,7 +95,7 @@ class EditPersonalities(QDialog):
         if reply == QMessageBox.Yes:
             del AI_PERSONALITIES[name]
             self.saveToFile()
-            self.loadPersonalities()
+            self.personality_list.takeItem(self.personality_list.row(current_item))
             self.clearPersonalityDetails()
             QMessageBox.information(self, "Removed", f"Personality '{name}' has been removed.")
 
@@ -108,16 +111,21 @@ class EditPersonalities(QDialog):
         # Read the personalities from the file
         with open(self.personalities_file, 'r') as f:
             content = f.read()
-            exec(content, globals())
-        for name in AI_PERSONALITIES.keys():
-            self.personality_list.addItem(name)
+        # Only evaluate the AI_PERSONALITIES literal instead of exec-ing the whole module into globals()
+        global AI_PERSONALITIES
+        AI_PERSONALITIES = next(
+            ast.literal_eval(node.value) for node in ast.parse(content).body
+            if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'AI_PERSONALITIES' for t in node.targets)
+        )
+        self._splitFile(self.personalities_file, "AI_PERSONALITIES", content.splitlines(keepends=True))
+        self.personality_list.addItems(list(AI_PERSONALITIES))
 
     def loadPersonalityDetails(self, item):
         name = item.text()
         personality = AI_PERSONALITIES[name]
         self.name_edit.setText(personality['name'])
-        self.system_message_edit.setText(personality['system_message'])
-        self.ai_name_combo.setCurrentText(personality['ai_name'])
+        self.system_message_edit.setPlainText(personality['system_message'])
+        self.ai_name_combo.setCurrentIndex(self._ai_index.get(personality['ai_name'], 0))
         self.current_color = QColor(personality['color'])
         self.updateColorButton()
 
@@ -177,38 +185,26 @@ class EditPersonalities(QDialog):
             'color': "#000000"  # Default to black
         }
 
-        self.loadPersonalities()
-        # Select the new personality
-        items = self.personality_list.findItems(new_name, Qt.MatchExactly)
-        if items:
-            self.personality_list.setCurrentItem(items[0])
-            self.loadPersonalityDetails(items[0])
+        # Append just the new row instead of reloading and rebuilding the whole list
+        self.personality_list.addItem(new_name)
+        new_item = self.personality_list.item(self.personality_list.count() - 1)
+        self.personality_list.setCurrentItem(new_item)
+        self.loadPersonalityDetails(new_item)
 
     def saveToFile(self):
-        with open(self.personalities_file, 'r') as f:
-            lines = f.readlines()
-
-        # Find the start and end of the AI_PERSONALITIES dictionary
-        start_index = next(i for i, line in enumerate(lines) if line.strip().startswith("AI_PERSONALITIES = {"))
-        end_index = next(i for i in range(start_index + 1, len(lines)) if lines[i].strip() == "}")
-
         # Convert the AI_PERSONALITIES dictionary to a formatted string
-        personalities_str = "AI_PERSONALITIES = {\n"
+        parts = ["AI_PERSONALITIES = {\n"]
         for name, personality in AI_PERSONALITIES.items():
-            personalities_str += f'    "{name}": {{\n'
-            personalities_str += f'        "name": "{personality["name"]}",\n'
-            personalities_str += f'        "system_message": """{personality["system_message"]}""",\n'
-            personalities_str += f'        "ai_name": "{personality["ai_name"]}",\n'
-            personalities_str += f'        "color": "{personality["color"]}",\n'
-            personalities_str += "    },\n"
-        personalities_str += "}"
-
-        # Replace the old AI_PERSONALITIES dictionary with the new one
-        lines[start_index:end_index + 1] = [personalities_str]
-
-        # Write the updated content back to the file
-        with open(self.personalities_file, 'w') as f:
-            f.writelines(lines)
+            parts.append(f'    {name!r}: {{\n'
+                         f'        "name": {personality["name"]!r},\n'
+                         f'        "system_message": {self._pythonString(personality["system_message"])},\n'
+                         f'        "ai_name": {personality["ai_name"]!r},\n'
+                         f'        "color": {personality["color"]!r},\n'
+                         "    },\n")
+        parts.append("}")
+        personalities_str = "".join(parts)
+
+        self._writeBlock(self.personalities_file, "AI_PERSONALITIES", personalities_str)
 
 
 if __name__ == '__main__':
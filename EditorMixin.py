@@ -0,0 +1,90 @@
+import os
+from PyQt5.QtCore import QSettings
+
+
+class EditorMixin:
+    """
+    Shared helpers for the dialogs that edit a dict literal in one of the app's Python modules.
+
+    Mixed into EditAIConfigs, EditPersonalities and EditHelperPersonalities ahead of QDialog.
+    It also remembers each dialog's window geometry between sessions.
+    """
+
+    _file_parts = None  # (path, block name, mtime, prefix lines, suffix lines) of the last split, see _splitFile
+
+    def _restoreSavedGeometry(self):
+        # Reopen where the user last left the dialog; the size set before this is only used the first time
+        geometry = QSettings("AI_Group_Conversation", self.__class__.__name__).value("geometry")
+        if geometry is not None:
+            self.restoreGeometry(geometry)
+
+    def done(self, result):
+        # done() runs for every way the dialog is closed (window button, Escape, accept/reject)
+        QSettings("AI_Group_Conversation", self.__class__.__name__).setValue("geometry", self.saveGeometry())
+        super().done(result)
+
+    def _splitFile(self, path, block_name, lines=None):
+        """
+        Return the lines before and after the `block_name = {...}` block in path.
+
+        The split is cached and the file is only re-read when its modification time changes,
+        so repeated saves don't re-read and re-scan the whole file.
+
+        Args:
+            path (str): The Python file holding the block.
+            block_name (str): The name the dict literal is assigned to.
+            lines (list): The file's lines, if the caller has just read them.
+
+        Raises:
+            ValueError: If the file has no such block.
+        """
+        mtime = os.stat(path).st_mtime_ns
+        if lines is None and self._file_parts is not None and self._file_parts[:3] == (path, block_name, mtime):
+            return self._file_parts[3], self._file_parts[4]
+
+        if lines is None:
+            with open(path, 'r') as f:
+                lines = f.readlines()
+
+        # Find the start and end of the dictionary in a single pass
+        start_marker = f"{block_name} = {{"
+        start_index = None
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if start_index is None:
+                if stripped.startswith(start_marker):
+                    start_index = i
+            elif stripped == "}":
+                end_index = i
+                break
+        else:
+            raise ValueError(f"Could not find the {block_name} dictionary in {path}")
+        self._file_parts = (path, block_name, mtime, lines[:start_index], lines[end_index + 1:])
+        return self._file_parts[3], self._file_parts[4]
+
+    def _writeBlock(self, path, block_name, block_text):
+        """
+        Replace the `block_name = {...}` block in path with block_text and write the file in one call.
+
+        Args:
+            path (str): The Python file holding the block.
+            block_name (str): The name the dict literal is assigned to.
+            block_text (str): The new block, including its assignment line.
+        """
+        prefix_lines, suffix_lines = self._splitFile(path, block_name)
+        with open(path, 'w') as f:
+            f.write("".join(prefix_lines) + block_text + "".join(suffix_lines))
+        # Only the block changed, so the cached surrounding lines are still current
+        self._file_parts = (path, block_name, os.stat(path).st_mtime_ns, prefix_lines, suffix_lines)
+
+    @staticmethod
+    def _pythonString(text):
+        """
+        Return a Python literal for text, keeping the readable triple-quoted form when it round-trips.
+
+        Text containing triple quotes, backslashes or carriage returns, or ending in a quote, falls
+        back to repr, which always parses back to the same string.
+        """
+        if '"""' in text or '\\' in text or '\r' in text or text.endswith('"'):
+            return repr(text)
+        return f'"""{text}"""'
@@ -0,0 +1,183 @@
+import json
+import logging
+import mmap
+import os
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import ijson
+    HISTORY_DECODE_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    # ijson is optional; without it the history file is parsed in one go (orjson or json.load)
+    ijson = None
+    HISTORY_DECODE_ERRORS = (json.JSONDecodeError,)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def load_history_file(history_file: str) -> dict:
+    """
+    Parse a conversation history JSON file in one go.
+
+    With orjson the file is memory-mapped and handed to the parser directly, so the
+    document is never copied into a Python bytes object; otherwise json.load is used.
+
+    Raises:
+        FileNotFoundError: If the history file does not exist.
+        json.JSONDecodeError: If the file is not valid JSON (orjson's error subclasses it).
+    """
+    if orjson is None:
+        with open(history_file, 'r') as f:
+            return json.load(f)
+
+    with open(history_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap cannot map an empty file; let the parser report it
+            return orjson.loads(b'')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+SCHEMA_VERSION = 2
+
+
+class HistoryIndex:
+    """
+    A SQLite sidecar index for conversation_history.json.
+
+    The JSON file remains the source of truth and is written by ConversationManager.
+    The sidecar holds one row per thread (indexed by date) and one row per message,
+    and is rebuilt only when the JSON file's modification time changes, so opening
+    the history window and switching threads become SQL lookups instead of a full
+    JSON parse. It also keeps one rolling moderator summary per thread, tagged with
+    how many messages it covers and a hash of those messages; these survive rebuilds.
+
+    Attributes:
+        history_file (str): Path to the conversation history JSON file.
+        index_file (str): Path to the SQLite sidecar.
+    """
+
+    def __init__(self, history_file: str = 'conversation_history.json', index_file: str = None):
+        self.history_file = history_file
+        self.index_file = index_file or os.path.splitext(history_file)[0] + '.sqlite'
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.conn = sqlite3.connect(self.index_file)
+        self._create_schema()
+
+    def _create_schema(self):
+        # WAL lets the window's reader connection keep serving thread lookups while a
+        # background HistoryLoadRunnable rebuilds the index on its own connection
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # The sidecar is only a cache of the JSON file; rebuild it rather than migrating
+            self.conn.executescript("""
+                DROP TABLE IF EXISTS meta;
+                DROP TABLE IF EXISTS threads;
+                DROP TABLE IF EXISTS messages;
+                DROP TABLE IF EXISTS summaries;
+            """)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                CREATE TABLE IF NOT EXISTS threads (
+                    thread_id TEXT PRIMARY KEY,
+                    date TEXT,
+                    topic TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_threads_date ON threads(date DESC);
+                CREATE TABLE IF NOT EXISTS messages (
+                    thread_id TEXT,
+                    pos INTEGER,
+                    sender TEXT,
+                    message TEXT,
+                    timestamp TEXT,
+                    PRIMARY KEY (thread_id, pos)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS summaries (
+                    thread_id TEXT PRIMARY KEY,
+                    content_hash TEXT,
+                    message_count INTEGER,
+                    summary TEXT
+                );
+            """)
+
+    def refresh(self) -> bool:
+        """
+        Re-ingest the JSON file if it changed since the last ingest.
+
+        Returns:
+            bool: True if the index was rebuilt, False if it was already current.
+
+        Raises:
+            FileNotFoundError: If the history file does not exist.
+        """
+        source_mtime = str(os.stat(self.history_file).st_mtime_ns)
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'source_mtime'").fetchone()
+        if row and row[0] == source_mtime:
+            return False
+
+        self.logger.debug(f"Rebuilding history index from {self.history_file}")
+        with self.conn:
+            self.conn.execute("DELETE FROM threads")
+            self.conn.execute("DELETE FROM messages")
+            for thread_id, thread in self._iter_threads():
+                self.conn.execute("INSERT INTO threads (thread_id, date, topic) VALUES (?, ?, ?)",
+                                  (thread_id, thread['date'], thread['topic']))
+                self.conn.executemany(
+                    "INSERT INTO messages (thread_id, pos, sender, message, timestamp) VALUES (?, ?, ?, ?, ?)",
+                    ((thread_id, pos, msg['sender'], msg['message'], msg.get('timestamp'))
+                     for pos, msg in enumerate(thread['messages']))
+                )
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('source_mtime', ?)", (source_mtime,))
+        return True
+
+    def _iter_threads(self):
+        if ijson is None:
+            yield from load_history_file(self.history_file).items()
+            return
+
+        # Stream one thread at a time instead of materializing the whole document
+        with open(self.history_file, 'rb') as f:
+            yield from ijson.kvitems(f, '')
+
+    def threads(self) -> List[Tuple[str, str, str]]:
+        """Return (thread_id, date, topic) for every thread, most recent first."""
+        return self.conn.execute("SELECT thread_id, date, topic FROM threads ORDER BY date DESC").fetchall()
+
+    def messages(self, thread_id: str) -> List[Dict[str, str]]:
+        """Return the messages of a thread in their original order."""
+        rows = self.conn.execute(
+            "SELECT sender, message, timestamp FROM messages WHERE thread_id = ? ORDER BY pos", (thread_id,)
+        )
+        return [{'sender': sender, 'message': message, 'timestamp': timestamp} for sender, message, timestamp in rows]
+
+    def latest_summary(self, thread_id: str) -> Optional[Tuple[str, int, str]]:
+        """
+        Return the rolling moderator summary of a thread, if one was stored.
+
+        Returns:
+            Optional[Tuple[str, int, str]]: (content_hash, message_count, summary), where the summary
+            covers the first message_count messages and content_hash is the hash of those messages.
+        """
+        return self.conn.execute(
+            "SELECT content_hash, message_count, summary FROM summaries WHERE thread_id = ?", (thread_id,)
+        ).fetchone()
+
+    def store_summary(self, thread_id: str, content_hash: str, message_count: int, summary: str):
+        """Replace the thread's rolling summary with one covering its first message_count messages."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO summaries (thread_id, content_hash, message_count, summary) VALUES (?, ?, ?, ?)",
+                (thread_id, content_hash, message_count, summary)
+            )
+
+    def close(self):
+        self.conn.close()
@@ -1,12 +1,15 @@
 import logging
 from PyQt5.QtWidgets import QWidget, QVBoxLayout
+from PyQt5.QtCore import QTimer
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import numpy as np
-from sklearn.decomposition import PCA
 
 
 class VectorGraphVisualizer(QWidget):
+    ANNOTATION_COUNT = 50  # Number of words labelled on the plot
+    RESIZE_DEBOUNCE_MS = 50  # Quiet period after the last resize event before re-laying out the figure
+
     def __init__(self, rag):
         super().__init__()
         self.rag = rag
@@ -18,60 +21,104 @@ class VectorGraphVisualizer(QWidget):
         self.ax = self.figure.add_subplot(111)
         self.logger = logging.getLogger(self.__class__.__name__)
         self.setMinimumSize(200, 150)  # Set a minimum size for the widget
+        self._fitted_matrix = None  # The vector_history matrix the cached points were computed from
+        self._points = None
+        self._scatter = None  # PathCollection reused across updates
+        self._annotations = []
+        self._pending_size = None
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(self.RESIZE_DEBOUNCE_MS)
+        self._resize_timer.timeout.connect(self._apply_resize)
 
     def reset(self):
-        self.ax.clear()
-        self.ax.set_title("Word Vector Space (PCA)")
-        self.ax.set_xlabel("First Principal Component")
-        self.ax.set_ylabel("Second Principal Component")
-        self.canvas.draw()
+        self._clear_axes()
+        self.ax.set_title("Word Vector Space (SVD)")
+        self.ax.set_xlabel("First Component")
+        self.ax.set_ylabel("Second Component")
+        self.canvas.draw_idle()
         self.logger.info("Vector graph reset")
 
+    def _clear_axes(self):
+        self.ax.clear()
+        # ax.clear() removes the artists, so they have to be recreated on the next plot
+        self._scatter = None
+        self._annotations = []
+
     def set_rag(self, rag):
         self.rag = rag
         self.update_plot()
 
     def update_plot(self):
         try:
-            self.ax.clear()
             if self.rag.vector_history is not None and len(self.rag.word_history) > 0:
-                vectors = self.rag.vector_history.toarray()
-                if vectors.shape[0] > 1:
-                    pca = PCA(n_components=2)
-                    points = pca.fit_transform(vectors)
-                    self.ax.scatter(points[:, 0], points[:, 1], alpha=0.7)
+                vector_history = self.rag.vector_history
+                if vector_history.shape[0] > 1:
+                    # TruncatedSVD works on the sparse matrix directly; the RAG hands out a new matrix
+                    # object whenever rows change, so the projection is only recomputed then
+                    if vector_history is not self._fitted_matrix:
+                        # sklearn is slow to import, so wait until there is actually something to project
+                        from sklearn.decomposition import TruncatedSVD
+                        svd = TruncatedSVD(n_components=2)
+                        self._points = svd.fit_transform(vector_history)
+                        self._fitted_matrix = vector_history
+                    points = self._points
+
+                    if self._scatter is None:
+                        # Create the scatter and the word labels once, then only move them on later updates
+                        self._clear_axes()
+                        self._scatter = self.ax.scatter(points[:, 0], points[:, 1], alpha=0.7)
+                        self._annotations = [
+                            self.ax.annotate("", (0, 0), xytext=(5, 5), textcoords='offset points',
+                                             fontsize=8, alpha=0.8)
+                            for _ in range(self.ANNOTATION_COUNT)
+                        ]
+                        self.ax.set_title("Word Vector Space (SVD)")
+                        self.ax.set_xlabel("First Component")
+                        self.ax.set_ylabel("Second Component")
+                    else:
+                        self._scatter.set_offsets(points)
+                        self.ax.dataLim.update_from_data_xy(points, ignore=True)
+                        self.ax.autoscale_view()
 
                     # Plot a subset of words to avoid cluttering
-                    plot_indices = np.linspace(0, len(self.rag.word_history) - 1, 50, dtype=int)
-                    for i in plot_indices:
-                        self.ax.annotate(self.rag.word_history[i], (points[i, 0], points[i, 1]),
-                                         xytext=(5, 5), textcoords='offset points',
-                                         fontsize=8, alpha=0.8)
-
-                    self.ax.set_title("Word Vector Space (PCA)")
-                    self.ax.set_xlabel("First Principal Component")
-                    self.ax.set_ylabel("Second Principal Component")
-                elif vectors.shape[0] == 1:
-                    self.ax.scatter([vectors[0, 0]], [0])
-                    self.ax.annotate(self.rag.word_history[0], (vectors[0, 0], 0),
+                    plot_indices = np.linspace(0, len(self.rag.word_history) - 1, self.ANNOTATION_COUNT, dtype=int)
+                    for annotation, i in zip(self._annotations, plot_indices):
+                        annotation.xy = points[i]
+                        annotation.set_text(self.rag.word_history[i])
+                elif vector_history.shape[0] == 1:
+                    self._clear_axes()
+                    x = vector_history.data[0] if vector_history.nnz else 0.0
+                    self.ax.scatter([x], [0])
+                    self.ax.annotate(self.rag.word_history[0], (x, 0),
                                      xytext=(5, 5), textcoords='offset points',
                                      fontsize=8)
                     self.ax.set_title("Single Word Vector")
                 else:
+                    self._clear_axes()
                     self.logger.warning("No vectors to plot")
             else:
+                self._clear_axes()
                 self.logger.warning("Vector history is None or empty, unable to update plot")
                 self.ax.set_title("No data to display")
 
             self.figure.tight_layout()
-            self.canvas.draw()
+            self.canvas.draw_idle()
         except Exception as e:
             self.logger.error(f"Error updating plot: {e}")
 
     def resizeEvent(self, event):
         try:
             super().resizeEvent(event)
-            new_size = event.size()
+            # A window drag delivers a burst of resize events; only lay out and redraw once it settles
+            self._pending_size = event.size()
+            self._resize_timer.start()
+        except Exception as e:
+            self.logger.error(f"Error in resizeEvent: {e}")
+
+    def _apply_resize(self):
+        try:
+            new_size = self._pending_size
             self.logger.debug(f"New size - Width: {new_size.width()}, Height: {new_size.height()}")
 
             # Ensure minimum dimensions
@@ -85,11 +132,11 @@ class VectorGraphVisualizer(QWidget):
 
                 self.figure.set_size_inches(winch, hinch, forward=False)
                 self.figure.tight_layout()
-                self.canvas.draw()
+                self.canvas.draw_idle()
             else:
                 self.logger.warning(f"Invalid widget size - Width: {width}, Height: {height}")
         except Exception as e:
-            self.logger.error(f"Error in resizeEvent: {e}")
+            self.logger.error(f"Error applying resize: {e}")
 
     def closeEvent(self, event):
         try:
@@ -1,11 +1,7 @@
-import anthropic
-import openai
-import google.generativeai as genai
 import json
-import datetime
 import logging
 import os
-import traceback
+import sys
 import asyncio
 from typing import AsyncGenerator
 from keys import anthropic_key, openai_key, gemini_key
@@ -13,34 +9,52 @@ from keys import anthropic_key, openai_key, gemini_key
 # Get the logger
 logger = logging.getLogger(__name__)
 
-# Configure Google Generative AI
-genai.configure(api_key=gemini_key)
+# The provider SDKs are slow to import, so each one is imported and configured the first time
+# its generate function runs; importing this module (e.g. from the config editors) stays cheap
+_anthropic_client = None
+_openai = None
+_genai = None
 
-# Configure OpenAI
-openai.api_key = openai_key
 
-# Configure Anthropic
-anthropic_client = anthropic.AsyncAnthropic(api_key=anthropic_key)
+def get_anthropic_client():
+    global _anthropic_client
+    if _anthropic_client is None:
+        import anthropic
+        _anthropic_client = anthropic.AsyncAnthropic(api_key=anthropic_key)
+    return _anthropic_client
+
+
+def get_openai():
+    global _openai
+    if _openai is None:
+        import openai
+        openai.api_key = openai_key
+        _openai = openai
+    return _openai
+
+
+def get_genai():
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        genai.configure(api_key=gemini_key)
+        _genai = genai
+    return _genai
 
 def log_ai_error(ai_name: str, error_message: str):
     """
-    Logs an AI-related error message and traceback.
+    Logs an AI-related error message, with the traceback of the exception being handled if there is one.
 
     Args:
         ai_name (str): The name of the AI service (e.g., 'Anthropic', 'Google Generative AI', 'OpenAI').
         error_message (str): The error message to log.
     """
-    log_entry = {
-        'timestamp': datetime.datetime.now().isoformat(),
-        'ai_name': ai_name,
-        'error_message': error_message,
-        'traceback': traceback.format_exc()
-    }
-    logger.error(f"AI Error - {ai_name}: {error_message}\n{log_entry['traceback']}")
+    # exc_info lets the logging handler format the traceback only if the record is actually emitted
+    logger.error(f"AI Error - {ai_name}: {error_message}", exc_info=sys.exc_info()[0] is not None)
 
 async def anthropic_generate(model: str, prompt: str) -> AsyncGenerator[str, None]:
     try:
-        async with anthropic_client.messages.stream(
+        async with get_anthropic_client().messages.stream(
             model=model,
             max_tokens=1000,
             messages=[{"role": "user", "content": prompt}]
@@ -55,7 +69,7 @@ async def anthropic_generate(model: str, prompt: str) -> AsyncGenerator[str, Non
 
 async def openai_generate(model: str, prompt: str) -> AsyncGenerator[str, None]:
     try:
-        async for chunk in await openai.ChatCompletion.acreate(
+        async for chunk in await get_openai().ChatCompletion.acreate(
             model=model,
             messages=[{"role": "user", "content": prompt}],
             stream=True
@@ -70,7 +84,7 @@ async def openai_generate(model: str, prompt: str) -> AsyncGenerator[str, None]:
 
 async def genai_generate(model: str, prompt: str) -> AsyncGenerator[str, None]:
     try:
-        genai_model = genai.GenerativeModel(model)
+        genai_model = get_genai().GenerativeModel(model)
         response = await genai_model.generate_content_async(prompt, stream=True)
         async for chunk in response:
             if chunk.text:
@@ -1,18 +1,100 @@
 import cmd2
-from rich.console import Console
+from rich.console import Console, Group
 from rich.markdown import Markdown
-from rich.syntax import Syntax
 from rich.panel import Panel
 from rich.text import Text
-from rich.style import Style
-from rich.align import Align
 from rich.live import Live
 from rich.spinner import Spinner
+from rich.theme import Theme
 import asyncio
-from asyncio import Queue
+import concurrent.futures
+from collections import deque
+from operator import itemgetter
 import logging
+import logging.handlers
+import queue
+from contextlib import nullcontext
 from typing import Optional
 from conversation_manager import ConversationManager
+from personalities import AI_PERSONALITIES
+
+try:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.patch_stdout import patch_stdout
+except ImportError:
+    # prompt_toolkit is optional; without it input() is read on an executor thread
+    PromptSession = None
+    patch_stdout = None
+
+try:
+    import uvloop
+    _new_event_loop = uvloop.new_event_loop
+except ImportError:
+    # uvloop is optional and unavailable on Windows; fall back to the stock loop
+    _new_event_loop = asyncio.new_event_loop
+
+# Python 3.12+: run tasks synchronously until their first real suspension
+_eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+
+# Printed between a message's header and its text in show_conversation_history
+_HISTORY_SEPARATOR = ":\n" + "─" * 40 + "\n"
+
+# Words that end the conversation in process_input, and the characters they can start with
+_QUIT_WORDS = frozenset({'quit', 'exit', 'bye'})
+_QUIT_INITIALS = frozenset(word[0] for word in _QUIT_WORDS) | frozenset(word[0].upper() for word in _QUIT_WORDS)
+
+# Shown by !help
+_HELP_TEXT = """
+        Commands:
+        !help - Show this help message
+        !quit or !exit - Exit the application
+        !switch_thread [thread_id] - Switch to a different conversation thread
+        !list_threads - List all available conversation threads
+        !clear - Clear the current conversation thread
+        !history - Show conversation history
+
+        To direct a comment at a specific participant, start your message with their name followed by a colon.
+        Example: "Vanessa: What do you think about this?"
+        """
+
+# The help text never changes, so parse the Markdown once and reprint the same renderable
+_HELP_RENDERABLE = Markdown(_HELP_TEXT)
+
+
+class _LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the QueueListener without formatting them first.
+
+    The stock QueueHandler formats every record on the logging thread so it could be pickled to
+    another process; the listener here runs in the same process, so all formatting is left to the
+    listener thread's file handler.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def _render_history_chunks(messages, sender_style, chunk_size: int = 256):
+    """
+    Yields the history view of messages as one Text per chunk_size messages.
+
+    Args:
+        messages: The MessageEntry objects to render, in order.
+        sender_style: Callable mapping (sender, default) to the style name for that sender.
+        chunk_size (int): Number of messages per yielded Text.
+    """
+    for start in range(0, len(messages), chunk_size):
+        # Collect (text, style) segments and build each Text once instead of appending to it per field
+        segments = []
+        add_segments = segments.extend
+        for entry in messages[start:start + chunk_size]:
+            add_segments((
+                (f"[{entry.timestamp}] ", "bold"),
+                (entry.sender, sender_style(entry.sender, "bold cyan")),
+                (_HISTORY_SEPARATOR, ""),
+                (f"{entry.message}\n\n", ""),
+            ))
+        yield Text.assemble(*segments)
 
 
 class AIConversationCLI(cmd2.Cmd):
@@ -28,13 +110,17 @@ class AIConversationCLI(cmd2.Cmd):
         prompt (str): The command prompt string.
         console (Console): A Rich console object for formatted output.
         ai_conversation_task (asyncio.Task): The main AI conversation loop task.
+        conversation_round (int): Number of completed conversation rounds in the current thread.
         async_alert (str): An alert string for async mode.
         async_mode (bool): Flag indicating if async mode is active.
         is_generating (asyncio.Event): Event to track if AI is currently generating a response.
-        input_queue (asyncio.Queue): Queue for managing user input.
+        input_queue (collections.deque): Queue for managing user input, signalled by an asyncio.Event.
         logger (logging.Logger): Logger for this class.
     """
 
+    _colored_console = None  # Console themed with the personality colors, see _get_colored_console
+    _sender_styles = {}  # Personality name -> its theme style name
+
     def __init__(self):
         """
         Initializes the AIConversationCLI instance.
@@ -44,15 +130,38 @@ class AIConversationCLI(cmd2.Cmd):
         """
         super().__init__(allow_cli_args=False)
         self.setup_logging()
-        self.prompt = "User> "
+        # Command name -> bound do_* method, so onecmd_async doesn't build and look up the name per command
+        self._cmd_dispatch = {name[3:]: getattr(self, name) for name in dir(self) if name.startswith('do_')}
+        # '!' command name -> handler taking the remaining words; async handlers return a coroutine
+        self._handle_dispatch = {
+            'history': lambda args: self.show_conversation_history(),
+            'help': lambda args: self.do__help(),
+            'switch_thread': self._switch_thread_command,
+            'list_threads': lambda args: self.do__list_threads(),
+            'clear': lambda args: self.do__clear(),
+        }
+        self.prompt = self._user_prompt = "User> "
         self.console = Console()
         self.conversation_manager = None  # Will be initialized in run()
         self.ai_conversation_task = None
+        self.conversation_round = 0  # Round 0 starts a fresh AI conversation; reset when the thread changes
+        self._loop = None  # The running event loop, cached in run()
+        # History saves run on one worker thread so JSON serialization doesn't stall the event loop
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='conv-save')
+        self._save_task = None  # Pending debounced save, see schedule_save
+        self._history_cache = None  # (sorted threads, thread option lines) for show_conversation_history
+        self._history_cache_version = -1  # conversation_manager.history_version the cache was built from
         self.async_alert = cmd2.ansi.style("(async) ", fg=cmd2.ansi.Fg.CYAN)
         self.async_mode = False
-        self.is_generating = asyncio.Event()
-        self.is_generating.set()
-        self.input_queue = Queue()
+        # One producer (onecmd_async) and one consumer (ai_conversation_loop), so a deque plus an
+        # Event is enough and avoids asyncio.Queue's waiter bookkeeping per message
+        self.input_queue = deque()
+        # The events are created in run(), once the event loop they belong to is running
+        self.is_generating = None
+        self._input_ready = None
+        # Futures of callers waiting for the next line read by cmdloop_async, the only reader of stdin
+        self._line_waiters = deque()
+        self._session = PromptSession() if PromptSession is not None else None
         self.logger.debug("AIConversationCLI initialized")
 
     def setup_logging(self):
@@ -61,13 +170,18 @@ class AIConversationCLI(cmd2.Cmd):
 
         Configures logging to write to a file, overwriting it each time the application starts.
         The log includes timestamps, log levels, and function names for comprehensive debugging.
+        Records are handed to a QueueListener thread that does the file writes, so logging never
+        blocks the event loop on disk I/O.
         """
-        logging.basicConfig(
-            level=logging.DEBUG,
-            format='%(asctime)s - %(levelname)s - %(name)s - %(funcName)s - %(message)s',
-            filename='ai_conversation_app.log',
-            filemode='w'
+        file_handler = logging.FileHandler('ai_conversation_app.log', mode='w')
+        file_handler.setFormatter(
+            logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(funcName)s - %(message)s')
         )
+        log_queue = queue.SimpleQueue()
+        queue_handler = _LocalQueueHandler(log_queue)
+        logging.basicConfig(level=logging.DEBUG, handlers=[queue_handler])
+        self._log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+        self._log_listener.start()
         self.logger = logging.getLogger(self.__class__.__name__)
         self.logger.debug("Logging initialized")
 
@@ -78,8 +192,9 @@ class AIConversationCLI(cmd2.Cmd):
         Args:
             user_name (str): The name of the user to be displayed in the prompt.
         """
-        self.prompt = f"{user_name}> "
-        self.logger.debug(f"User prompt set to: {self.prompt}")
+        # Built once per name change; process_input reuses it every round
+        self.prompt = self._user_prompt = f"{user_name}> "
+        self.logger.debug("User prompt set to: %s", self.prompt)
 
     async def run(self) -> None:
         """
@@ -96,28 +211,52 @@ class AIConversationCLI(cmd2.Cmd):
             Exception: For any unexpected errors during execution.
         """
         self.logger.debug("Entering run method")
+        self._loop = asyncio.get_running_loop()
+        if _eager_task_factory is not None:
+            # Short commands and the conversation loop's first step then run without a scheduler hop
+            self._loop.set_task_factory(_eager_task_factory)
+        self.is_generating = asyncio.Event()
+        self.is_generating.set()
+        self._input_ready = asyncio.Event()
         try:
             if not self.conversation_manager:
                 user_name = await self.get_user_input("Please enter your name: ")
-                self.logger.debug(f"User name received: {user_name}")
+                self.logger.debug("User name received: %s", user_name)
                 self.conversation_manager = ConversationManager(user_name)
                 self.set_user_prompt(user_name)
-                self.logger.info(f"ConversationManager initialized for user: {user_name}")
+                self.logger.info("ConversationManager initialized for user: %s", user_name)
 
             self.logger.debug("Creating AI conversation task")
-            self.ai_conversation_task = asyncio.create_task(self.ai_conversation_loop())
+            self.ai_conversation_task = self._loop.create_task(self.ai_conversation_loop())
             self.logger.debug("AI conversation task created")
+            await self._warmup()
 
             self.logger.debug("Starting cmdloop_async")
-            await self.cmdloop_async()
+            # Streamed AI output and spinners are printed above the active prompt instead of through it
+            with patch_stdout(raw=True) if self._session is not None else nullcontext():
+                await self.cmdloop_async()
         except asyncio.CancelledError:
             self.logger.info("Main task cancelled")
         except Exception as e:
-            self.logger.error(f"Error in run method: {str(e)}", exc_info=True)
+            self.logger.error("Error in run method: %s", e, exc_info=True)
         finally:
             self.logger.debug("Entering cleanup")
             await self.cleanup()
             self.logger.debug("Cleanup completed")
+            # Last log call of the session: flush the queued records to the log file
+            self._log_listener.stop()
+
+    async def _warmup(self) -> None:
+        """
+        Pays one-time setup costs before the first prompt instead of on the user's first command.
+
+        Primes Rich's rendering path and builds the themed console used by the history view, then
+        yields once so the AI conversation task can start.
+        """
+        self.console.print("", end="")
+        self._get_colored_console()
+        await asyncio.sleep(0)
+        self.logger.debug("Warm-up completed")
 
     async def cleanup(self) -> None:
         """
@@ -139,11 +278,15 @@ class AIConversationCLI(cmd2.Cmd):
                 except asyncio.CancelledError:
                     self.logger.debug("AI conversation task cancelled successfully")
 
+            self.conversation_round = 0
+            if self._save_task and not self._save_task.done():
+                self._save_task.cancel()
             if self.conversation_manager:
                 self.logger.debug("Saving conversation history")
-                self.conversation_manager.save_conversation_history()
+                await self._write_history_async()
+            self._io_pool.shutdown(wait=True)
         except Exception as e:
-            self.logger.error(f"Error during cleanup: {str(e)}", exc_info=True)
+            self.logger.error("Error during cleanup: %s", e, exc_info=True)
         finally:
             self.logger.info("Cleanup completed")
 
@@ -151,6 +294,9 @@ class AIConversationCLI(cmd2.Cmd):
         """
         Gets user input asynchronously.
 
+        Only run() (before the command loop starts) and cmdloop_async read the terminal directly;
+        everything else waits for a line through read_line.
+
         Args:
             prompt (str): The prompt to display to the user.
 
@@ -158,17 +304,57 @@ class AIConversationCLI(cmd2.Cmd):
             str: The user's input.
         """
         try:
-            return await asyncio.get_event_loop().run_in_executor(None, input, prompt)
+            if self._session is not None:
+                # Reads input on the event loop itself, without an executor thread per prompt
+                return await self._session.prompt_async(prompt)
+            return await self._loop.run_in_executor(None, input, prompt)
         except Exception as e:
-            self.logger.error(f"Error getting user input: {str(e)}")
+            self.logger.error("Error getting user input: %s", e)
             return ""
 
+    async def read_line(self, prompt: str = "") -> str:
+        """
+        Waits for the next line the user enters at the main prompt.
+
+        cmdloop_async is the only task reading the terminal; it hands each line to the oldest
+        waiting caller before treating it as a command.
+
+        Args:
+            prompt (str): Text printed above the prompt to say what is being asked for.
+
+        Returns:
+            str: The line entered.
+        """
+        if prompt:
+            self.console.print(prompt)
+        waiter = self._loop.create_future()
+        self._line_waiters.append(waiter)
+        return await waiter
+
+    def _deliver_line(self, line: str) -> bool:
+        """
+        Resolves the oldest read_line caller still waiting with line.
+
+        Returns:
+            bool: True if a caller took the line, False if there was none.
+        """
+        waiters = self._line_waiters
+        while waiters:
+            waiter = waiters.popleft()
+            # Callers cancelled while waiting (e.g. process_input interrupted) leave done futures behind
+            if not waiter.done():
+                waiter.set_result(line)
+                return True
+        return False
+
     async def cmdloop_async(self):
         """
         Asynchronous version of cmd2's cmdloop.
 
         This method runs the main command loop of the application, handling user input
-        and processing commands asynchronously.
+        and processing commands asynchronously. It is the single reader of the terminal:
+        a line goes to a read_line caller if one is waiting, otherwise it is dispatched
+        as a command.
         """
         self.logger.debug("Starting cmdloop_async")
         self.preloop()
@@ -178,12 +364,11 @@ class AIConversationCLI(cmd2.Cmd):
                     # Wait until not generating before accepting input
                     await self.is_generating.wait()
                     line = await self.get_user_input(self.prompt)
-                    if not line:
+                    if not line or self._deliver_line(line):
                         continue
-                    line = self.precmd(line)
+                    # cmd2's precmd/postcmd hooks are not used here, so lines go straight to dispatch
                     stop = await self.onecmd_async(line)
-                    stop = self.postcmd(stop, line)
-                    if stop or line.lower() in ['exit', 'quit']:
+                    if stop or line.lower() in {'exit', 'quit'}:
                         self.logger.info("Exit command received")
                         break
                 except KeyboardInterrupt:
@@ -191,7 +376,7 @@ class AIConversationCLI(cmd2.Cmd):
                     self.console.print("\nKeyboard interrupt received. Exiting...")
                     break
                 except Exception as e:
-                    self.logger.error(f"Error in command loop: {str(e)}", exc_info=True)
+                    self.logger.error("Error in command loop: %s", e, exc_info=True)
         finally:
             self.postloop()
         self.logger.debug("Exiting cmdloop_async")
@@ -209,73 +394,54 @@ class AIConversationCLI(cmd2.Cmd):
         Returns:
             bool: True if the application should exit, False otherwise.
         """
-        self.logger.debug(f"Processing command: {line}")
-        if line.startswith('!'):
-            await self.handle_command(line[1:])
+        self.logger.debug("Processing command: %s", line)
+        if line[:1] == '!':
+            # Commands run on ai_conversation_loop so the reader is free to answer their prompts
+            self.input_queue.append(line)
+            self._input_ready.set()
             return False
 
-        cmd, arg, line = self.parseline(line)
-        if not line:
-            return self.emptyline()
-        if cmd is None:
+        # A plain split is enough to find the command word; cmd2's statement parser isn't needed
+        cmd, _, arg = line.strip().partition(' ')
+        func = self._cmd_dispatch.get(cmd)
+        if func is None:
             return self.default(line)
-        self.lastcmd = line
-        if line == 'EOF':
-            self.lastcmd = ''
-        if cmd == '':
-            return self.default(line)
-        else:
-            try:
-                func = getattr(self, 'do_' + cmd)
-                if cmd != 'quit':
-                    await self.input_queue.put(line)
-                    return False
-                return func(arg)
-            except AttributeError:
-                return self.default(line)
+        if cmd != 'quit':
+            self.input_queue.append(line)
+            self._input_ready.set()
+            return False
+        return func(arg)
 
     async def ai_conversation_loop(self):
         """
         Main loop for processing user input and generating AI responses.
 
-        This method continuously monitors the input queue for user messages,
+        This method continuously monitors the input queue for user messages and '!' commands,
         processes them, and generates AI responses using the ConversationManager.
         """
         self.logger.debug("Starting AI conversation loop")
         while True:
             try:
-                user_input = await self.input_queue.get()
-                self.logger.debug(f"Processing user input: {user_input}")
-                await self.process_input(user_input)
+                while not self.input_queue:
+                    await self._input_ready.wait()
+                    self._input_ready.clear()
+                user_input = self.input_queue.popleft()
+                self.logger.debug("Processing user input: %s", user_input)
+                if user_input[:1] == '!':
+                    await self.handle_command(user_input[1:])
+                    continue
+                # Lines queued together (e.g. a pasted multi-line prompt) form one turn; stop at the next command
+                lines = [user_input]
+                while self.input_queue and self.input_queue[0][:1] != '!':
+                    lines.append(self.input_queue.popleft())
+                await self.process_input("\n".join(lines))
             except asyncio.CancelledError:
                 self.logger.info("AI conversation loop cancelled")
                 break
             except Exception as e:
-                self.logger.error(f"Error in AI conversation loop: {str(e)}", exc_info=True)
+                self.logger.error("Error in AI conversation loop: %s", e, exc_info=True)
         self.logger.debug("Exiting AI conversation loop")
 
-    async def get_user_input_with_empty_check(self, prompt: str) -> str:
-        """
-        Gets user input asynchronously and checks for empty input.
-
-        This method will continue prompting until non-empty input is received.
-        There is no timeout implemented, as per the requirement to always wait
-        for user input before continuing the conversation.
-
-        Args:
-            prompt (str): The prompt to display to the user.
-
-        Returns:
-            str: The user's non-empty input.
-        """
-        self.logger.debug("Prompting user for input: %s", prompt)
-        while True:
-            user_input = await self.get_user_input(prompt)
-            if user_input.strip():
-                self.logger.debug("Received non-empty user input: %s", user_input)
-                return user_input
-            self.logger.debug("Received empty input, prompting again")
-
     async def process_input(self, user_input: str) -> None:
         """
         Processes user input and manages the conversation flow.
@@ -289,42 +455,47 @@ class AIConversationCLI(cmd2.Cmd):
         """
         self.logger.debug("Entering process_input method with user input: %s", user_input)
 
-        # Initialize conversation_round attribute if not already set
-        if not hasattr(self, 'conversation_round'):
-            self.conversation_round = 0
-
         while True:
             self.logger.debug("Starting conversation round: %d", self.conversation_round)
 
-            if self.conversation_round == 0:
-                # Initial round: Generate the first set of AI responses based on user input
-                self.logger.info("Initiating first round of AI responses")
-                user_prompt = await self.conversation_manager.generate_ai_conversation(user_input)
-                self.conversation_round += 1  # Increment the round counter after the initial round
-                self.logger.debug("Incremented conversation round counter to: %d", self.conversation_round)
-            else:
-                # Subsequent rounds: Continue the conversation based on the latest user input
-                self.logger.info("Continuing conversation in subsequent round")
-                user_prompt = await self.conversation_manager.continue_conversation(user_input)
-
-            self.logger.debug("Received user prompt: %s", user_prompt)
-
             # Set the appropriate prompt for the user
-            self.prompt = f"{self.conversation_manager.user_name}> "
+            self.prompt = self._user_prompt
             self.logger.debug("Set user prompt: %s", self.prompt)
 
-            # Get user input, ensuring non-empty input
-            user_input = await self.get_user_input_with_empty_check(self.prompt)
+            # Claim the user's next line before the AIs respond, so typing overlaps generation
+            input_task = self._loop.create_task(self.get_user_input_with_empty_check())
+            try:
+                if self.conversation_round == 0:
+                    # Initial round: Generate the first set of AI responses based on user input
+                    self.logger.info("Initiating first round of AI responses")
+                    user_prompt = await self.conversation_manager.generate_ai_conversation(user_input)
+                    self.conversation_round += 1  # Increment the round counter after the initial round
+                    self.logger.debug("Incremented conversation round counter to: %d", self.conversation_round)
+                else:
+                    # Subsequent rounds: Continue the conversation based on the latest user input
+                    self.logger.info("Continuing conversation in subsequent round")
+                    user_prompt = await self.conversation_manager.continue_conversation(user_input)
+
+                self.logger.debug("Received user prompt: %s", user_prompt)
+
+                # Get user input, ensuring non-empty input
+                user_input = await input_task
+            except BaseException:
+                # Give up the claim on the next line so cmdloop_async dispatches it normally
+                input_task.cancel()
+                raise
 
             # Add a new line after user input for better readability
             self.console.print()
 
-            if user_input.lower() in ['quit', 'exit', 'bye']:
+            # Branch on the first character once; only inputs that could be a quit word get lowercased
+            first = user_input[:1]
+            if first in _QUIT_INITIALS and user_input.lower() in _QUIT_WORDS:
                 self.logger.info("User requested to quit the conversation")
                 return  # Exit the conversation
 
             # Check if the input is a command (starts with '!')
-            if user_input.startswith('!'):
+            if first == '!':
                 self.logger.info("Detected command input: %s", user_input)
                 await self.handle_command(user_input[1:])
                 continue
@@ -337,27 +508,23 @@ class AIConversationCLI(cmd2.Cmd):
             self.conversation_round += 1
             self.logger.debug("Incremented conversation round counter to: %d", self.conversation_round)
 
-    async def get_user_input_with_empty_check(self, prompt: str) -> str:
+    async def get_user_input_with_empty_check(self) -> str:
         """
         Gets user input asynchronously and checks for empty input.
 
-        This method will continue prompting until non-empty input is received.
-        It displays the prompt only once to avoid double prompting.
-
-        Args:
-            prompt (str): The prompt to display to the user.
+        This method will keep waiting until a non-empty line is received. The line is
+        read by cmdloop_async at the main prompt.
 
         Returns:
             str: The user's non-empty input.
         """
-        self.logger.debug("Prompting user for input: %s", prompt)
+        self.logger.debug("Waiting for user input")
         while True:
-            user_input = await self.get_user_input(prompt)
+            user_input = await self.read_line()
             if user_input.strip():
                 self.logger.debug("Received non-empty user input: %s", user_input)
                 return user_input
-            self.logger.debug("Received empty input, prompting again")
-            prompt = ""  # Clear the prompt for subsequent attempts
+            self.logger.debug("Received empty input, waiting again")
 
     async def handle_empty_input(self) -> str:
         """
@@ -380,25 +547,23 @@ class AIConversationCLI(cmd2.Cmd):
         Args:
             command (str): The command to process (without the leading '!').
         """
-        self.logger.debug(f"Handling command: {command}")
+        self.logger.debug("Handling command: %s", command)
         cmd_parts = command.split()
-        cmd = cmd_parts[0].lower()
-
-        if cmd == 'history':
-            await self.show_conversation_history()
-        elif cmd == 'help':
-            self.do__help()
-        elif cmd == 'switch_thread':
-            if len(cmd_parts) > 1:
-                self.do__switch_thread(cmd_parts[1])
-            else:
-                self.console.print("[bold red]Please specify a thread ID[/bold red]")
-        elif cmd == 'list_threads':
-            self.do__list_threads()
-        elif cmd == 'clear':
-            self.do__clear()
-        else:
+        cmd = cmd_parts[0].lower() if cmd_parts else ""
+
+        handler = self._handle_dispatch.get(cmd)
+        if handler is None:
             self.console.print(f"[bold red]Unknown command: {cmd}[/bold red]")
+            return
+        result = handler(cmd_parts[1:])
+        if asyncio.iscoroutine(result):
+            await result
+
+    def _switch_thread_command(self, args):
+        if args:
+            self.do__switch_thread(args[0])
+        else:
+            self.console.print("[bold red]Please specify a thread ID[/bold red]")
 
     async def show_conversation_history(self):
         """
@@ -408,8 +573,77 @@ class AIConversationCLI(cmd2.Cmd):
         and then displays the selected thread's messages with proper formatting.
         """
         self.logger.debug("Showing conversation history")
-        # Implementation details for showing conversation history
-        # (This part would be similar to the previous implementation)
+        # Sorting and formatting the thread list is only redone when the history changed since the last view
+        if self.conversation_manager.history_version != self._history_cache_version:
+            # Decorate with the sort key up front so sorting compares plain tuples' first items
+            decorated = [(thread.date, thread_id, thread)
+                         for thread_id, thread in self.conversation_manager.conversation_history.items()]
+            decorated.sort(key=itemgetter(0), reverse=True)
+            sorted_threads = [(thread_id, thread) for _, thread_id, thread in decorated]
+            thread_options = [
+                f"{i}. {thread.date} - {thread.topic or 'Untitled'} ({len(thread.messages)} messages)"
+                for i, (_, _, thread) in enumerate(decorated, 1)
+            ]
+            self._history_cache = (sorted_threads, thread_options)
+            self._history_cache_version = self.conversation_manager.history_version
+        sorted_threads, thread_options = self._history_cache
+
+        if not sorted_threads:
+            self.console.print("[bold red]No conversation history available[/bold red]")
+            return
+
+        self.console.print("[bold]Conversation threads:[/bold]\n" + "\n".join(thread_options))
+        choice = await self.read_line("Enter the number of the thread to display:")
+        if not choice.strip().isdigit() or not 1 <= int(choice) <= len(sorted_threads):
+            self.console.print(f"[bold red]Invalid selection: {choice}[/bold red]")
+            return
+        thread_id, thread = sorted_threads[int(choice) - 1]
+
+        self.logger.debug("Displaying history of thread: %s", thread_id)
+        colored_console = self._get_colored_console()
+        # One flat sender -> style lookup per entry; the user's name is only known per session
+        sender_style = {**self._sender_styles, self.conversation_manager.user_name: "sender.user"}.get
+        # Feed the pager one Text per chunk of messages rather than one Text for the whole thread
+        with colored_console.pager(styles=True):
+            colored_console.print(f"[bold]{thread.topic or 'Untitled'}[/bold] ({thread.date})\n")
+            for chunk in _render_history_chunks(thread.messages, sender_style):
+                colored_console.print(chunk)
+
+    def display_thread(self, thread_id: str):
+        """
+        Prints every message of a thread without touching the conversation state.
+
+        The messages are rendered into a single Group and printed with one console call, so showing
+        a long thread costs one render rather than one per message.
+
+        Args:
+            thread_id (str): The ID of a thread in conversation_history.
+        """
+        messages = self.conversation_manager.conversation_history[thread_id].messages
+        if not messages:
+            return
+        colored_console = self._get_colored_console()
+        sender_style = {**self._sender_styles, self.conversation_manager.user_name: "sender.user"}.get
+        colored_console.print(Group(*_render_history_chunks(messages, sender_style)))
+
+    @classmethod
+    def _get_colored_console(cls) -> Console:
+        """
+        Returns a Console whose theme has a style per AI personality color, plus the Moderator and user.
+
+        The personalities don't change while the CLI runs, so the theme and console are built once
+        and shared by every history view.
+        """
+        if cls._colored_console is None:
+            cls._sender_styles = {name: f"sender.{name}" for name in AI_PERSONALITIES}
+            cls._sender_styles["Moderator"] = "sender.moderator"
+            styles = {cls._sender_styles[name]: f"bold {personality['color']}"
+                      for name, personality in AI_PERSONALITIES.items()}
+            styles["sender.moderator"] = "bold yellow"
+            styles["sender.user"] = "bold green"
+            theme = Theme(styles)
+            cls._colored_console = Console(theme=theme)
+        return cls._colored_console
 
     def do__help(self):
         """
@@ -418,19 +652,7 @@ class AIConversationCLI(cmd2.Cmd):
         This method provides information about the available commands and their usage.
         """
         self.logger.debug("Displaying help message")
-        help_text = """
-        Commands:
-        !help - Show this help message
-        !quit or !exit - Exit the application
-        !switch_thread [thread_id] - Switch to a different conversation thread
-        !list_threads - List all available conversation threads
-        !clear - Clear the current conversation thread
-        !history - Show conversation history
-
-        To direct a comment at a specific participant, start your message with their name followed by a colon.
-        Example: "Vanessa: What do you think about this?"
-        """
-        self.console.print(Markdown(help_text))
+        self.console.print(_HELP_RENDERABLE)
 
     def do__switch_thread(self, thread_id: str):
         """
@@ -441,17 +663,17 @@ class AIConversationCLI(cmd2.Cmd):
         Args:
             thread_id (str): The ID of the thread to switch to.
         """
-        self.logger.debug(f"Attempting to switch to thread: {thread_id}")
+        self.logger.debug("Attempting to switch to thread: %s", thread_id)
         if thread_id in self.conversation_manager.conversation_history:
-            self.conversation_manager.current_thread_id = thread_id
+            # The thread's messages are already in the history; only the derived state needs rebuilding
+            self.conversation_manager.activate_thread(thread_id)
             self.console.print(f"[bold]Switched to thread: {thread_id}[/bold]")
-            # Replay the conversation history for the new thread
-            for entry in self.conversation_manager.conversation_history[thread_id]:
-                self.conversation_manager.update_conversation(entry['message'], entry['sender'])
-            self.logger.info(f"Successfully switched to thread: {thread_id}")
+            self.display_thread(thread_id)
+            self.conversation_round = 0
+            self.logger.info("Successfully switched to thread: %s", thread_id)
         else:
             self.console.print(f"[bold red]Thread {thread_id} not found[/bold red]")
-            self.logger.warning(f"Attempted to switch to non-existent thread: {thread_id}")
+            self.logger.warning("Attempted to switch to non-existent thread: %s", thread_id)
 
     def do__list_threads(self):
         """
@@ -460,11 +682,11 @@ class AIConversationCLI(cmd2.Cmd):
         This method displays a list of all conversation threads and their message counts.
         """
         self.logger.debug("Listing available threads")
-        thread_list = "\n".join(
-            [f"{thread_id}: {len(messages)} messages" for thread_id, messages in
-             self.conversation_manager.conversation_history.items()])
-        self.console.print(f"[bold]Available threads:[/bold]\n{thread_list}")
-        self.logger.debug(f"Thread list displayed: {thread_list}")
+        history = self.conversation_manager.conversation_history
+        thread_list = "\n".join(f"{thread_id}: {len(thread.messages)} messages" for thread_id, thread in history.items())
+        # One print of a prebuilt Text; the rows are plain text, so Rich has no markup to parse in them
+        self.console.print(Text.assemble(("Available threads:", "bold"), "\n", thread_list))
+        self.logger.debug("Thread list displayed: %d threads", len(history))
 
     def do__clear(self):
         """
@@ -472,16 +694,46 @@ class AIConversationCLI(cmd2.Cmd):
 
             This method removes all messages from the current conversation thread.
             """
-        self.logger.debug(f"Attempting to clear current thread: {self.conversation_manager.current_thread_id}")
+        self.logger.debug("Attempting to clear current thread: %s", self.conversation_manager.current_thread_id)
         if self.conversation_manager.current_thread_id in self.conversation_manager.conversation_history:
-            self.conversation_manager.conversation_history[self.conversation_manager.current_thread_id] = []
-            self.conversation_manager.save_conversation_history()
+            self.conversation_manager.clear_thread(self.conversation_manager.current_thread_id)
+            self.schedule_save()
+            self.conversation_round = 0
             self.console.print("[bold green]Conversation cleared[/bold green]")
-            self.logger.info(f"Cleared conversation thread: {self.conversation_manager.current_thread_id}")
+            self.logger.info("Cleared conversation thread: %s", self.conversation_manager.current_thread_id)
         else:
             self.console.print("[bold red]No active conversation thread to clear[/bold red]")
             self.logger.warning("Attempted to clear non-existent or inactive thread")
 
+    def schedule_save(self, delay: float = 0.5) -> None:
+        """
+        Saves the conversation history on the I/O worker thread after a short delay.
+
+        Calls made while a save is already pending are folded into that save, so a burst of
+        changes results in a single write.
+
+        Args:
+            delay (float): Seconds to wait for further changes before saving.
+        """
+        if self._save_task and not self._save_task.done():
+            return
+
+        async def save_later():
+            await asyncio.sleep(delay)
+            await self._write_history_async()
+
+        self._save_task = self._loop.create_task(save_later())
+
+    async def _write_history_async(self) -> None:
+        """
+        Saves the conversation history, writing the file on the I/O worker thread.
+
+        The snapshot is taken here on the event loop, which is the only thread that modifies the
+        history, so the worker only serializes and writes data nothing else can touch.
+        """
+        snapshot = self.conversation_manager.snapshot_conversation_history()
+        await self._loop.run_in_executor(self._io_pool, self.conversation_manager.write_conversation_history, snapshot)
+
     def do__quit(self, arg):
         """
         Handles the quit command to exit the application.
@@ -510,30 +762,14 @@ class AIConversationCLI(cmd2.Cmd):
         Args:
             statement: The user's input statement.
         """
-        self.logger.debug(f"Processing default input: {statement}")
-        try:
-            # Check if the input is a command (starts with '!')
-            if statement.startswith('!'):
-                asyncio.create_task(self.handle_command(statement[1:]))
-            else:
-                asyncio.create_task(self.process_input_wrapper(statement))
-        except Exception as e:
-            self.logger.error(f"Error processing input: {str(e)}", exc_info=True)
-
-    async def process_input_wrapper(self, statement):
-        """
-        Wrapper to handle the asynchronous process_input method.
-
-        This method provides a way to call the asynchronous process_input method
-        from synchronous contexts.
-
-        Args:
-            statement: The user's input statement.
-        """
+        self.logger.debug("Processing default input: %s", statement)
         try:
-            await self.process_input(statement)
+            # Hand the line to the running ai_conversation_loop rather than spawning a task per line,
+            # which also keeps two process_input calls from running at once
+            self.input_queue.append(statement)
+            self._input_ready.set()
         except Exception as e:
-            self.logger.error(f"Error in process_input: {str(e)}", exc_info=True)
+            self.logger.error("Error processing input: %s", e, exc_info=True)
 
     async def display_thinking_message(self, participant: str):
         """
@@ -549,8 +785,8 @@ class AIConversationCLI(cmd2.Cmd):
         spinner = Spinner('dots', text=message)
         with Live(spinner, refresh_per_second=10, transient=True) as live:
             while self.conversation_manager.thinking_participant == participant:
-                await asyncio.sleep(0.1)
-        self.logger.debug(f"Finished displaying thinking message for {participant}")
+                await self.conversation_manager.wait_for_thinking_change()
+        self.logger.debug("Finished displaying thinking message for %s", participant)
 
     async def generate_moderator_summary(self):
         """
@@ -568,7 +804,7 @@ class AIConversationCLI(cmd2.Cmd):
             self.logger.debug("Moderator summary generated successfully")
             self.conversation_manager.update_conversation(summary, "Moderator")
         except Exception as e:
-            self.logger.error(f"Error generating moderator summary: {str(e)}")
+            self.logger.error("Error generating moderator summary: %s", e)
             self.conversation_manager.update_conversation("Unable to generate summary at this time.", "System")
         finally:
             self.conversation_manager.thinking_participant = None
@@ -599,7 +835,7 @@ class AIConversationCLI(cmd2.Cmd):
         Args:
             new_name (str): The new name for the user.
         """
-        self.logger.debug(f"Updating user name to: {new_name}")
+        self.logger.debug("Updating user name to: %s", new_name)
         self.conversation_manager.user_name = new_name
         self.set_user_prompt(new_name)
         self.console.print(f"[bold green]User name updated to: {new_name}[/bold green]")
@@ -613,13 +849,13 @@ class AIConversationCLI(cmd2.Cmd):
         Args:
             file_format (str): The format to export the conversation (e.g., 'txt', 'json').
         """
-        self.logger.debug(f"Exporting conversation in {file_format} format")
+        self.logger.debug("Exporting conversation in %s format", file_format)
         try:
             # Implementation for exporting conversation
             # This would involve formatting the conversation data and writing it to a file
             self.console.print(f"[bold green]Conversation exported successfully in {file_format} format[/bold green]")
         except Exception as e:
-            self.logger.error(f"Error exporting conversation: {str(e)}")
+            self.logger.error("Error exporting conversation: %s", e)
             self.console.print("[bold red]Failed to export conversation[/bold red]")
 
     def print_debug_info(self):
@@ -642,3 +878,17 @@ class AIConversationCLI(cmd2.Cmd):
     # Additional helper methods can be added here as needed
 
 # End of AIConversationCLI class
+
+
+if __name__ == '__main__':
+    # The CLI spends its time awaiting input, queues and AI streams, so run it on uvloop when available
+    loop = _new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(AIConversationCLI().run())
+    finally:
+        # Close any AI response streams still suspended, as asyncio.run would; the default executor
+        # isn't awaited because it may still hold a thread blocked in input()
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
@@ -2,6 +2,7 @@ import logging
 import json
 import random
 import asyncio
+import threading
 from datetime import datetime
 from typing import Dict, List, AsyncGenerator, Optional, Union, Tuple
 from PyQt5.QtCore import QObject, pyqtSignal
@@ -13,6 +14,13 @@ from ai_config import AI_CONFIG, log_ai_error
 from personalities import AI_PERSONALITIES, HELPER_PERSONALITIES, MASTER_SYSTEM_MESSAGE, USER_IDENTITY
 from ConversationRAG import ConversationRAG
 from Visualizer import VectorGraphVisualizer
+from HistoryIndex import load_history_file
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; the stdlib json module is used without it
+    orjson = None
 
 
 class ConversationManager(QObject):
@@ -28,9 +36,12 @@ class ConversationManager(QObject):
         self.user_name: str = user_name
         self.is_gui: bool = is_gui
         self.conversation_history: ConversationHistory = {}
+        self.history_version: int = 0  # Bumped whenever the history is loaded or changed, for caches of derived views
+        self._save_lock = threading.Lock()
         self.current_thread_id: str = ""
         self.CONVERSATION_HISTORY_FILE: str = "conversation_history.json"
-        self.thinking_participant: Optional[str] = None
+        self._thinking_participant: Optional[str] = None
+        self._thinking_changed: Optional[asyncio.Event] = None  # Created by the first wait_for_thinking_change
         self.participants: List[str] = list(AI_PERSONALITIES.keys())
         self.last_addressed: Optional[str] = None
         self.rag = ConversationRAG()
@@ -53,6 +64,25 @@ class ConversationManager(QObject):
 
         self.logger.debug("ConversationManager initialization complete")
 
+    @property
+    def thinking_participant(self) -> Optional[str]:
+        """The participant currently generating a response, or None."""
+        return self._thinking_participant
+
+    @thinking_participant.setter
+    def thinking_participant(self, participant: Optional[str]) -> None:
+        self._thinking_participant = participant
+        # Wake everything waiting in wait_for_thinking_change; later waiters get a fresh event
+        event, self._thinking_changed = self._thinking_changed, None
+        if event is not None:
+            event.set()
+
+    async def wait_for_thinking_change(self) -> None:
+        """Wait until thinking_participant is next assigned."""
+        if self._thinking_changed is None:
+            self._thinking_changed = asyncio.Event()
+        await self._thinking_changed.wait()
+
     def set_active_participants(self, participants: List[str]):
         self.active_participants = participants
         self.logger.info(f"Active participants set to: {self.active_participants}")
@@ -79,7 +109,7 @@ class ConversationManager(QObject):
         """
         Load or create user identity and emit greeting.
         """
-        self.logger.debug(f"Loading user identity for {self.user_name}")
+        self.logger.debug("Loading user identity for %s", self.user_name)
         if self.user_name in USER_IDENTITY:
             greeting = USER_IDENTITY[self.user_name]["greeting"]
             self.logger.info(f"User {self.user_name} found in USER_IDENTITY")
@@ -92,34 +122,65 @@ class ConversationManager(QObject):
 
     def load_conversation_history(self) -> None:
         try:
-            with open(self.CONVERSATION_HISTORY_FILE, "r") as file:
-                loaded_history = json.load(file)
+            loaded_history = load_history_file(self.CONVERSATION_HISTORY_FILE)
 
             self.conversation_history = {
                 thread_id: ConversationThread.from_dict(thread_data)
                 for thread_id, thread_data in loaded_history.items()
             }
 
-            self.logger.debug(f"Loaded conversation history from {self.CONVERSATION_HISTORY_FILE}")
+            self.logger.debug("Loaded conversation history from %s", self.CONVERSATION_HISTORY_FILE)
         except (FileNotFoundError, json.JSONDecodeError):
             self.conversation_history = {}
             self.logger.warning("Conversation history file not found or invalid. Starting with an empty history.")
+        self.history_version += 1
 
     def save_conversation_history(self) -> None:
-        try:
-            history_dict = {
-                thread_id: thread.to_dict()
-                for thread_id, thread in self.conversation_history.items()
-            }
-            with open(self.CONVERSATION_HISTORY_FILE, 'w') as file:
-                json.dump(history_dict, file, indent=2, default=str)
-            self.logger.debug(f"Saved conversation history to {self.CONVERSATION_HISTORY_FILE}")
-        except Exception as e:
-            self.logger.error(f"Error occurred while saving conversation history: {str(e)}", exc_info=True)
+        self.write_conversation_history(self.snapshot_conversation_history())
+
+    def snapshot_conversation_history(self) -> Dict:
+        """
+        Copy the conversation history into plain dicts ready to be written.
+
+        Call this on the thread that modifies the history (the event loop or GUI thread), so
+        the snapshot is never taken while update_conversation or new_topic is changing it.
+
+        Returns:
+            Dict: Thread ID -> the thread's to_dict() form.
+        """
+        return {
+            thread_id: thread.to_dict()
+            for thread_id, thread in self.conversation_history.items()
+        }
+
+    def write_conversation_history(self, history_dict: Dict) -> None:
+        """
+        Serialize a snapshot from snapshot_conversation_history and write it to the history file.
+
+        Safe to run on a worker thread (the CLI offloads it); concurrent writes are serialized.
+
+        Args:
+            history_dict (Dict): The snapshot to write.
+        """
+        with self._save_lock:
+            try:
+                if orjson is not None:
+                    # Passing datetimes through to default=str keeps them formatted as json.dump wrote them
+                    options = orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE | orjson.OPT_PASSTHROUGH_DATETIME
+                    data = orjson.dumps(history_dict, default=str, option=options)
+                    with open(self.CONVERSATION_HISTORY_FILE, 'wb') as file:
+                        file.write(data)
+                else:
+                    with open(self.CONVERSATION_HISTORY_FILE, 'w') as file:
+                        json.dump(history_dict, file, indent=2, default=str)
+                self.logger.debug("Saved conversation history to %s", self.CONVERSATION_HISTORY_FILE)
+            except Exception as e:
+                self.logger.error(f"Error occurred while saving conversation history: {str(e)}", exc_info=True)
 
     def update_conversation_topic(self, topic: str):
         if self.current_thread_id in self.conversation_history:
             self.conversation_history[self.current_thread_id].topic = topic
+            self.history_version += 1
             self.save_conversation_history()
             self.logger.info(f"Updated conversation topic: {topic}")
             # Emit a signal or update the GUI to display the new topic
@@ -130,7 +191,7 @@ class ConversationManager(QObject):
             self.logger.error("Cannot update topic: No active conversation thread")
 
     def update_conversation(self, message: str, sender: str = "User", ai_name: str = None, model: str = None) -> None:
-        self.logger.debug(f"Updating conversation with message from {sender}")
+        self.logger.debug("Updating conversation with message from %s", sender)
 
         if self.current_thread_id not in self.conversation_history:
             self.new_topic()
@@ -154,6 +215,7 @@ class ConversationManager(QObject):
         messages = self.conversation_history[self.current_thread_id].messages
         if not messages or new_entry != messages[-1]:
             messages.append(new_entry)
+            self.history_version += 1
             self.save_conversation_history()
 
             # Update the RAG database
@@ -167,15 +229,35 @@ class ConversationManager(QObject):
         else:
             self.logger.debug("Skipping duplicate message")
 
-    async def generate_moderator_summary_for_history(self, thread_id: str) -> str:
-        self.logger.debug(f"Generating moderator summary for historical thread: {thread_id}")
+    async def generate_moderator_summary_for_history(self, thread_id: str, previous_summary: Optional[str] = None,
+                                                     summarized_count: int = 0) -> str:
+        """
+        Summarize a historical thread as the Moderator.
+
+        Args:
+            thread_id (str): The thread to summarize.
+            previous_summary (Optional[str]): A summary of the thread's first summarized_count messages.
+                When given, only the later messages are sent and the Moderator extends that summary.
+            summarized_count (int): Number of leading messages covered by previous_summary.
+
+        Returns:
+            str: The summary, or a message starting with "Unable to generate summary" on failure.
+        """
+        self.logger.debug("Generating moderator summary for historical thread: %s", thread_id)
         self.thinking_participant = "Moderator"
 
         try:
-            await self.create_session()
-            conversation_text = self.get_conversation_context_for_history(thread_id)
+            # No aiohttp session here: the generate functions use their own module-level clients, whose
+            # connection pools stay warm on the shared background loop between summaries
+            if previous_summary is None:
+                summarized_count = 0
+            conversation_text = self.get_conversation_context_for_history(thread_id, summarized_count)
             if not conversation_text:
                 return "Unable to generate summary: No conversation history found."
+            if previous_summary is not None:
+                self.logger.debug("Extending stored summary with messages from index %s", summarized_count)
+                conversation_text = (f"Summary of the conversation so far:\n{previous_summary}\n\n"
+                                     f"New messages since that summary:\n{conversation_text}")
 
             context_detector = HELPER_PERSONALITIES['ContextDetector']
             context_ai_config = AI_CONFIG[context_detector['ai_name']]
@@ -186,17 +268,22 @@ class ConversationManager(QObject):
             moderator = HELPER_PERSONALITIES['Moderator']
             moderator_ai_config = AI_CONFIG[moderator['ai_name']]
             moderator_prompt = f"{moderator['system_message']}\n\nConversation context: {context_category}\n\nConversation:\n{conversation_text}\n\nProvide a summary based on the conversation context:"
+            if previous_summary is not None:
+                moderator_prompt += " Update the summary so far with the new messages and return the complete updated summary."
 
             summary = await self.generate_summary(moderator_ai_config, moderator_prompt)
 
             self.logger.debug("Moderator summary for historical thread generated successfully")
             return summary
+        except asyncio.CancelledError:
+            # Cancelled from the history window (e.g. it was closed)
+            self.logger.debug("Moderator summary for historical thread %s cancelled", thread_id)
+            raise
         except Exception as e:
             self.logger.error(f"Error generating moderator summary for historical thread: {str(e)}", exc_info=True)
             return f"Unable to generate summary: {str(e)}"
         finally:
             self.thinking_participant = None
-            await self.close_session()
 
     async def generate_context_category(self, ai_config, prompt):
         context_category = ""
@@ -210,10 +297,10 @@ class ConversationManager(QObject):
             summary += partial_summary
         return summary
 
-    def get_conversation_context_for_history(self, thread_id: str) -> str:
+    def get_conversation_context_for_history(self, thread_id: str, start: int = 0) -> str:
         if thread_id in self.conversation_history:
             thread = self.conversation_history[thread_id]
-            messages = thread.messages  # Access the messages attribute
+            messages = thread.messages[start:]  # Access the messages attribute
             return "\n".join([f"{msg.sender}: {msg.message}" for msg in messages])
         else:
             return "No conversation history found for the given thread ID."
@@ -227,7 +314,7 @@ class ConversationManager(QObject):
         """
         self.total_tokens += tokens
         self.token_usage_updated.emit(self.total_tokens)
-        self.logger.debug(f"Updated token usage. Total tokens: {self.total_tokens}")
+        self.logger.debug("Updated token usage. Total tokens: %d", self.total_tokens)
 
     def get_current_context(self) -> str:
         """
@@ -243,7 +330,7 @@ class ConversationManager(QObject):
             self.logger.error(f"Error getting current context: {str(e)}", exc_info=True)
             return ""
 
-    def get_conversation_context(self, thread_id: str) -> str:
+    async def get_conversation_context(self, thread_id: str) -> str:
         try:
             if self.current_round == 1:
                 return f"This is the start of a new conversation topic (Thread ID: {thread_id})."
@@ -252,7 +339,7 @@ class ConversationManager(QObject):
             if not recent_context:
                 return f"No recent context available for this topic (Thread ID: {thread_id})."
 
-            relevant_history = self.rag.get_relevant_history(recent_context)
+            relevant_history = await self.rag.get_relevant_history(recent_context)
 
             if relevant_history:
                 full_context = f"Recent relevant conversation (Thread ID: {thread_id}):\n{relevant_history}\n\nCurrent context:\n{recent_context}"
@@ -318,7 +405,7 @@ class ConversationManager(QObject):
 
     async def generate_ai_conversation(self, prompt: str, active_participants: List[str]) -> Dict[
         str, Tuple[str, str, str]]:
-        self.logger.debug(f"Generating AI conversation for prompt: {prompt}")
+        self.logger.debug("Generating AI conversation for prompt: %s", prompt)
         await self.create_session()
 
         if self.is_first_prompt:
@@ -336,14 +423,14 @@ class ConversationManager(QObject):
 
         try:
             for participant in active_participants:
-                self.logger.debug(f"Generating response for participant: {participant}")
+                self.logger.debug("Generating response for participant: %s", participant)
                 response, ai_name, model = await self.generate_single_response(participant, prompt)
                 if response:  # Only add non-empty responses
                     responses[participant] = (response, ai_name, model)
                     # Update conversation here instead of in generate_single_response
                     self.update_conversation(response, participant, ai_name, model)
                     self.ai_response_generated.emit(participant, response, ai_name, model)
-                    self.logger.debug(f"Response generated for {participant}: {response[:50]}...")
+                    self.logger.debug("Response generated for %s: %.50s...", participant, response)
 
             self.logger.info(f"Round of responses completed. Total responses: {len(responses)}")
 
@@ -355,7 +442,7 @@ class ConversationManager(QObject):
             else:
                 self.logger.info("Not all active participants have responded. Skipping topic generation.")
                 missing_participants = set(active_participants) - self.responded_participants
-                self.logger.debug(f"Participants who didn't respond: {missing_participants}")
+                self.logger.debug("Participants who didn't respond: %s", missing_participants)
 
             return responses
         except Exception as e:
@@ -368,7 +455,7 @@ class ConversationManager(QObject):
         ai_config = AI_CONFIG[topic_generator['ai_name']]
 
         # Create a context that includes the full conversation history
-        context = self.get_conversation_context(self.current_thread_id)
+        context = await self.get_conversation_context(self.current_thread_id)
 
         topic_prompt = f"{topic_generator['system_message']}\n\nConversation context:\n{context}\n\nGenerate a topic based on this conversation:"
 
@@ -376,7 +463,7 @@ class ConversationManager(QObject):
         async for partial_topic in ai_config['generate_func'](ai_config['model'], topic_prompt):
             topic += partial_topic.strip()
 
-        self.logger.debug(f"Generated topic: {topic}")
+        self.logger.debug("Generated topic: %s", topic)
 
         # Set the generated topic in the conversation history
         self.update_conversation_topic(topic)
@@ -384,7 +471,7 @@ class ConversationManager(QObject):
         return topic
 
     def extract_ai_response(self, full_response: str, participant: str) -> str:
-        self.logger.debug(f"Extracting AI response for {participant}")
+        self.logger.debug("Extracting AI response for %s", participant)
         try:
             # If the response is already in the correct format, return it
             if isinstance(full_response, str) and not full_response.startswith(participant):
@@ -415,7 +502,7 @@ class ConversationManager(QObject):
 
     async def generate_single_response(self, participant: str, prompt: str) -> Tuple[str, str, str]:
         self.thinking_participant = participant
-        self.logger.debug(f"Generating single response for {participant}")
+        self.logger.debug("Generating single response for %s", participant)
 
         if self.is_interrupted:
             return "", "", ""
@@ -438,7 +525,7 @@ class ConversationManager(QObject):
                 full_response += partial_response
 
             ai_response = self.extract_ai_response(full_response, participant)
-            self.logger.debug(f"Extracted response for {participant}: %.100s...", ai_response)
+            self.logger.debug("Extracted response for %s: %.100s...", participant, ai_response)
 
             # Get AI name and model
             ai_personality = AI_PERSONALITIES.get(participant) or HELPER_PERSONALITIES.get(participant)
@@ -453,7 +540,7 @@ class ConversationManager(QObject):
 
             # Add participant to the responded set
             self.responded_participants.add(participant)
-            self.logger.debug(f"Added {participant} to responded participants")
+            self.logger.debug("Added %s to responded participants", participant)
 
         except Exception as e:
             self.logger.error(f"Error generating response for {participant}: {str(e)}", exc_info=True)
@@ -490,7 +577,7 @@ class ConversationManager(QObject):
             async for partial_response in ai_config['generate_func'](ai_config['model'], prompt):
                 if partial_response.strip():
                     detected_participant = partial_response.strip()
-                    self.logger.debug(f"Detected addressed participant: {detected_participant}")
+                    self.logger.debug("Detected addressed participant: %s", detected_participant)
                     return detected_participant
         except Exception as e:
             self.logger.error(f"Error detecting addressed participant: {str(e)}", exc_info=True)
@@ -499,7 +586,7 @@ class ConversationManager(QObject):
         return None
 
     async def generate_ai_response(self, prompt: str, participant: str) -> AsyncGenerator[str, None]:
-        self.logger.debug(f"Generating AI response for {participant} in thread {self.current_thread_id}")
+        self.logger.debug("Generating AI response for %s in thread %s", participant, self.current_thread_id)
         await self.create_session()
 
         ai_personality = AI_PERSONALITIES.get(participant) or HELPER_PERSONALITIES.get(participant)
@@ -522,7 +609,7 @@ class ConversationManager(QObject):
             participants=", ".join([p for p in AI_PERSONALITIES if p != participant])
         )
 
-        conversation_context = self.get_conversation_context(self.current_thread_id)
+        conversation_context = await self.get_conversation_context(self.current_thread_id)
 
         is_new_topic = self.current_round == 1
         new_topic_indicator = f"This is a new conversation topic (Thread ID: {self.current_thread_id}). Please do not reference any previous conversations. " if is_new_topic else ""
@@ -533,7 +620,7 @@ class ConversationManager(QObject):
         self.response_token_count = 0
 
         try:
-            self.logger.debug(f"Sending full prompt to AI model for {participant} in thread {self.current_thread_id}")
+            self.logger.debug("Sending full prompt to AI model for %s in thread %s", participant, self.current_thread_id)
             async for partial_response in ai_config['generate_func'](model, full_prompt):
                 if self.is_interrupted:
                     self.logger.info(f"AI response generation for {participant} interrupted")
@@ -573,7 +660,7 @@ class ConversationManager(QObject):
         return "general", None
 
     async def continue_conversation(self, user_input: str, active_participants: List[str]) -> Optional[str]:
-        self.logger.debug(f"Continuing conversation with user input: {user_input}")
+        self.logger.debug("Continuing conversation with user input: %s", user_input)
         self.is_interrupted = False  # Reset interrupt flag at the start of conversation continuation
 
         if not self.current_thread_id or self.current_thread_id not in self.conversation_history:
@@ -627,7 +714,7 @@ class ConversationManager(QObject):
         try:
             await self.create_session()
 
-            conversation_text = self.get_conversation_context(self.current_thread_id)
+            conversation_text = await self.get_conversation_context(self.current_thread_id)
             context_detector = HELPER_PERSONALITIES['ContextDetector']
             context_ai_config = AI_CONFIG[context_detector['ai_name']]
             context_prompt = f"{context_detector['system_message']}\n\nConversation:\n{conversation_text}\n\nContext category:"
@@ -680,20 +767,21 @@ class ConversationManager(QObject):
                 topic="",
                 messages=[]
             )
+            self.history_version += 1
             self.responded_participants.clear()
             self.current_round = 0
             self.is_first_prompt = False
             self.logger.info(f"Created first conversation topic with thread ID: {self.current_thread_id}")
 
-            # Create a new RAG instance
+            # Reset the RAG for the new topic, reusing its vectorizer and buffers
             try:
-                self.rag = ConversationRAG()
-                self.logger.info("Created new ConversationRAG instance for new topic")
+                self.rag.clear()
+                self.logger.info("Cleared ConversationRAG for new topic")
                 if self.visualizer:
                     self.visualizer.set_rag(self.rag)
-                    self.logger.info("Updated visualizer with new RAG instance")
+                    self.logger.info("Updated visualizer with cleared RAG instance")
             except Exception as e:
-                self.logger.error(f"Error creating new RAG instance: {str(e)}", exc_info=True)
+                self.logger.error(f"Error clearing RAG instance: {str(e)}", exc_info=True)
                 self.logger.warning("Continuing with existing RAG instance")
 
             # Reset token counts for the new topic
@@ -710,6 +798,40 @@ class ConversationManager(QObject):
         else:
             self.logger.info("Starting a new topic")
 
+    def clear_thread(self, thread_id: str) -> None:
+        """
+        Remove every message from a thread. The caller is responsible for saving the history.
+
+        Args:
+            thread_id (str): The ID of a thread in conversation_history.
+        """
+        self.conversation_history[thread_id].messages = []
+        self.history_version += 1
+
+    def activate_thread(self, thread_id: str) -> None:
+        """
+        Make an existing thread the current one without re-adding its messages.
+
+        Only the in-memory derived state is rebuilt: the RAG is refilled from the thread's messages
+        in one pass. Nothing is appended to the thread and the history file is not rewritten.
+
+        Args:
+            thread_id (str): The ID of a thread in conversation_history.
+        """
+        self.current_thread_id = thread_id
+        self.is_first_prompt = False
+        self.responded_participants.clear()
+        self.current_round = 0
+        try:
+            self.rag.clear()
+            for entry in self.conversation_history[thread_id].messages:
+                self.rag.add_message(f"{entry.sender}: {entry.message}")
+            if self.visualizer:
+                self.visualizer.update_plot()
+        except Exception as e:
+            self.logger.error(f"Error rebuilding RAG for thread {thread_id}: {str(e)}", exc_info=True)
+        self.logger.info(f"Activated thread: {thread_id}")
+
     def start_conversation(self):
         self.logger.info("Initializing new conversation")
         initial_message = "A new conversation topic has been started. What would you like to discuss?"
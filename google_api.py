@@ -1,16 +1,53 @@
 import os
+import random
+import threading
+import time
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 
+MAX_RETRIES = 5
 
-def get_gmail_service():
-    creds = None
-    if os.path.exists('token.json'):
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
+TOKEN_FILE = 'token.json'
+
+# The Gmail service is built once per process and shared; see get_gmail_service
+_service = None
+_service_lock = threading.Lock()
+
+# Parsed token.json, so the common "token still valid" path skips the stat and JSON parse
+_cached_creds = None
+
+
+def load_credentials():
+    """Return the stored Google credentials, reading token.json only on a cache miss (None if absent)."""
+    global _cached_creds
+    if _cached_creds is None and os.path.exists(TOKEN_FILE):
+        _cached_creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+    return _cached_creds
+
+
+def save_credentials(creds):
+    """Write credentials to token.json and keep them as the cached copy."""
+    global _cached_creds
+    with open(TOKEN_FILE, 'w') as token:
+        token.write(creds.to_json())
+    _cached_creds = creds
+
+
+def discard_credentials():
+    """Forget the stored credentials, e.g. after a failed refresh."""
+    global _cached_creds
+    _cached_creds = None
+    if os.path.exists(TOKEN_FILE):
+        os.remove(TOKEN_FILE)
+
+
+def _build_gmail_service():
+    creds = load_credentials()
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             creds.refresh(Request())
@@ -18,7 +55,48 @@ def get_gmail_service():
             flow = InstalledAppFlow.from_client_secrets_file(
                 'credentials.json', SCOPES)
             creds = flow.run_local_server(port=0)
-        with open('token.json', 'w') as token:
-            token.write(creds.to_json())
-    service = build('gmail', 'v1', credentials=creds)
+        save_credentials(creds)
+    # Use the discovery document bundled with google-api-python-client instead of fetching it over HTTPS
+    service = build('gmail', 'v1', credentials=creds, static_discovery=True, cache_discovery=False)
     return service
+
+
+def get_gmail_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = _build_gmail_service()
+    return _service
+
+
+def invalidate_gmail_service():
+    """
+    Drop the cached service so the next call rebuilds it.
+
+    The rebuild reuses the stored credentials; call discard_credentials() first to force a new sign-in
+    (e.g. after a 401).
+    """
+    global _service
+    with _service_lock:
+        _service = None
+
+
+def _retry_delay(error, attempt):
+    """Seconds to wait before retrying a rate-limited request, honoring Retry-After when present."""
+    retry_after = error.resp.get('retry-after', '')
+    if retry_after.isdigit():
+        return int(retry_after)
+    return 2 ** attempt + random.random()
+
+
+def execute_with_backoff(request):
+    """Execute a Gmail API request, retrying with exponential backoff while it is rate limited (HTTP 429)."""
+    for attempt in range(MAX_RETRIES):
+        try:
+            return request.execute()
+        except HttpError as error:
+            if error.resp.status != 429 or attempt == MAX_RETRIES - 1:
+                raise
+            time.sleep(_retry_delay(error, attempt))
+